@@ -1,68 +1,166 @@
 """
 Модуль для работы с ffprobe и анализа медиа-файлов
 """
+import os
+import re
 import json
+import shutil
 import subprocess
+import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, List, Callable
 
 from .stream_info import StreamInfo, FileInfo, StreamType
 
+# orjson разбирает JSON от ffprobe в несколько раз быстрее, но не обязателен
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 
+# Максимум одновременно запущенных процессов ffprobe
+MAX_PARALLEL_PROBES = min(os.cpu_count() or 1, 8)
+
+# Поля, которые читают StreamInfo/FileInfo. Остальное (side_data_list,
+# codec tags, цветовые параметры и т.д.) ffprobe не выводит, что уменьшает JSON
+SHOW_ENTRIES = ":".join([
+    "stream=index,codec_type,codec_name,codec_long_name,duration,bit_rate,"
+    "width,height,pix_fmt,r_frame_rate,display_aspect_ratio,"
+    "sample_rate,channels,channel_layout",
+    "stream_disposition=default,forced,hearing_impaired,visual_impaired",
+    "stream_tags=language,title",
+    "format=format_name,format_long_name,duration,size,bit_rate",
+    "format_tags",
+    "chapter=id,time_base,start,start_time,end,end_time",
+    "chapter_tags=title",
+])
+
+# Разбор вывода "ffmpeg -i" (используется вместо ffprobe при prefer_ffmpeg)
+_FFMPEG_INPUT_RE = re.compile(r"^Input #\d+, (?P<format>.+?), from ")
+_FFMPEG_DURATION_RE = re.compile(
+    r"^\s+Duration: (?P<duration>[\d:.]+|N/A)(?:.*?bitrate: (?P<bitrate>\d+) kb/s)?"
+)
+_FFMPEG_CHAPTER_RE = re.compile(r"^\s+Chapter #")
+_FFMPEG_SIDE_DATA_RE = re.compile(r"^\s+Side data:")
+_FFMPEG_STREAM_RE = re.compile(
+    r"^\s+Stream #\d+:(?P<index>\d+)(?:\[\w+\])?(?:\((?P<language>\w+)\))?: "
+    r"(?P<type>\w+): (?P<details>.*)$"
+)
+_FFMPEG_METADATA_RE = re.compile(r"^\s+(?P<key>\w+)\s*: (?P<value>.*)$")
+_FFMPEG_SIZE_RE = re.compile(r"\b(\d{2,5})x(\d{2,5})\b")
+_FFMPEG_FPS_RE = re.compile(r"([\d.]+)(k?) fps")
+_FFMPEG_DAR_RE = re.compile(r"DAR (\d+:\d+)")
+_FFMPEG_BITRATE_RE = re.compile(r"(\d+) kb/s")
+_FFMPEG_AUDIO_RE = re.compile(r"(\d+) Hz, ([^,]+)")
+
+# Количество каналов для раскладок, которые ffmpeg печатает по имени
+_CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "7.1": 8}
+
+_FFMPEG_DISPOSITIONS = {
+    "default": "(default)",
+    "forced": "(forced)",
+    "hearing_impaired": "(hearing impaired)",
+    "visual_impaired": "(visual impaired)",
+}
+
+
 class FFProbeManager:
     """Менеджер для работы с ffprobe"""
 
-    def __init__(self, ffprobe_path: str = "ffprobe"):
+    def __init__(
+        self,
+        ffprobe_path: str = "ffprobe",
+        max_parallel: int = MAX_PARALLEL_PROBES,
+        ffmpeg_path: Optional[str] = None,
+        prefer_ffmpeg: bool = False
+    ):
         """
         Инициализация менеджера
 
         Args:
             ffprobe_path: Путь к исполняемому файлу ffprobe
+            max_parallel: Максимум одновременно запущенных процессов ffprobe
+            ffmpeg_path: Путь к исполняемому файлу ffmpeg
+            prefer_ffmpeg: Анализировать файлы через "ffmpeg -i" (ffmpeg уже
+                загружен в кэш страниц после конвертации), ffprobe используется
+                только если разобрать вывод ffmpeg не удалось
         """
+        self.ffmpeg_path = ffmpeg_path
+        self.prefer_ffmpeg = prefer_ffmpeg
+        self.max_parallel = max(1, max_parallel)
+        self._process_slots = threading.BoundedSemaphore(self.max_parallel)
+
+        # Наличие ffprobe проверяется один раз, а не перед каждым анализом;
+        # при смене пути исполняемый файл ищется заново (см. ffprobe_path)
+        self._binary: Optional[str] = None
+        self._available = False
         self.ffprobe_path = ffprobe_path
 
-    def probe_file(self, filepath: str) -> Optional[FileInfo]:
+    @property
+    def ffprobe_path(self) -> str:
+        """Путь к исполняемому файлу ffprobe"""
+        return self._ffprobe_path
+
+    @ffprobe_path.setter
+    def ffprobe_path(self, path: str):
+        self._ffprobe_path = path
+        self.invalidate()
+
+    def probe_file(
+        self,
+        filepath: str,
+        process_started: Optional[Callable[[subprocess.Popen], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Optional[FileInfo]:
         """
         Анализировать медиа-файл и получить полную информацию
 
         Args:
             filepath: Путь к файлу
+            process_started: Вызывается с запущенным процессом, чтобы
+                вызывающий код мог прервать анализ (terminate)
+            is_cancelled: Возвращает True, если вызывающий код прервал
+                анализ; тогда завершение процесса не считается ошибкой
 
         Returns:
             FileInfo объект с информацией о файле или None при ошибке
         """
+        if self.prefer_ffmpeg and self.ffmpeg_path:
+            file_info = self._probe_via_ffmpeg(filepath, process_started)
+            if file_info or (is_cancelled and is_cancelled()):
+                return file_info
+
         try:
             # Строим команду ffprobe
             cmd = [
-                self.ffprobe_path,
-                "-v", "quiet",
+                self._binary or self.ffprobe_path,
+                "-v", "error",
                 "-print_format", "json",
-                "-show_format",
-                "-show_streams",
-                "-show_chapters",
+                "-show_entries", SHOW_ENTRIES,
                 filepath
             ]
 
             logger.debug(f"Запуск ffprobe: {' '.join(cmd)}")
 
-            # Выполняем команду
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            # Вывод читаем как bytes: JSON от ffprobe всегда в UTF-8
+            result = self._run_process(cmd, process_started)
 
             if result.returncode != 0:
-                logger.error(f"ffprobe вернул ошибку: {result.stderr}")
+                # Прерванный анализ (файл сменили) - ожидаемый исход
+                if is_cancelled and is_cancelled():
+                    logger.debug(f"Анализ прерван: {filepath}")
+                    return None
+                logger.error(f"ffprobe вернул ошибку: {result.stderr.decode('utf-8', errors='replace')}")
                 return None
 
-            # Парсим JSON
-            data = json.loads(result.stdout)
+            # Парсим JSON (orjson.JSONDecodeError наследует json.JSONDecodeError)
+            data = _json_loads(result.stdout)
 
             # Создаем FileInfo объект
             file_info = self._parse_file_info(filepath, data)
@@ -81,6 +179,280 @@ class FFProbeManager:
             logger.error(f"Ошибка при анализе файла {filepath}: {e}")
             return None
 
+    def _probe_via_ffmpeg(
+        self,
+        filepath: str,
+        process_started: Optional[Callable[[subprocess.Popen], None]] = None
+    ) -> Optional[FileInfo]:
+        """
+        Анализировать медиа-файл через "ffmpeg -i" без запуска ffprobe
+
+        ffmpeg не умеет выводить JSON, поэтому разбирается таблица потоков,
+        которую он печатает в stderr. Главы при этом не извлекаются.
+
+        Args:
+            filepath: Путь к файлу
+            process_started: См. probe_file()
+
+        Returns:
+            FileInfo объект или None, если вывод не удалось разобрать
+        """
+        try:
+            cmd = [self.ffmpeg_path, "-hide_banner", "-i", filepath]
+
+            logger.debug(f"Запуск ffmpeg для анализа: {' '.join(cmd)}")
+
+            # Без выходного файла ffmpeg завершается с кодом 1 - это ожидаемо
+            result = self._run_process(cmd, process_started)
+
+            data = self._parse_ffmpeg_output(result.stderr.decode("utf-8", errors="replace"))
+            if not data["streams"]:
+                logger.debug(f"ffmpeg не вернул потоков для {filepath}, используем ffprobe")
+                return None
+
+            data["format"]["size"] = os.path.getsize(filepath)
+            file_info = self._parse_file_info(filepath, data)
+
+            logger.info(f"Проанализирован файл (ffmpeg): {file_info.get_summary()}")
+
+            return file_info
+
+        except Exception as e:
+            logger.debug(f"Не удалось проанализировать файл через ffmpeg: {e}")
+            return None
+
+    def _run_process(
+        self,
+        cmd: List[str],
+        process_started: Optional[Callable[[subprocess.Popen], None]] = None,
+        timeout: float = 30
+    ) -> subprocess.CompletedProcess:
+        """
+        Запустить процесс (не более max_parallel одновременно) и дождаться вывода
+
+        Args:
+            cmd: Команда
+            process_started: Вызывается с запущенным процессом
+            timeout: Таймаут в секундах
+
+        Returns:
+            CompletedProcess с stdout/stderr в виде bytes
+
+        Raises:
+            subprocess.TimeoutExpired: Процесс не завершился за timeout
+        """
+        with self._process_slots:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+
+            if process_started:
+                process_started(process)
+
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    @classmethod
+    def _parse_ffmpeg_output(cls, output: str) -> dict:
+        """
+        Преобразовать вывод "ffmpeg -i" в структуру, аналогичную JSON от ffprobe
+
+        Args:
+            output: stderr ffmpeg
+
+        Returns:
+            Словарь с ключами "format" и "streams"
+        """
+        format_data: dict = {"tags": {}}
+        streams: list = []
+        tags = format_data["tags"]
+
+        for line in output.splitlines():
+            match = _FFMPEG_INPUT_RE.match(line)
+            if match:
+                format_data["format_name"] = match.group("format")
+                tags = format_data["tags"]
+                continue
+
+            match = _FFMPEG_DURATION_RE.match(line)
+            if match:
+                format_data["duration"] = cls._parse_timestamp(match.group("duration"))
+                if match.group("bitrate"):
+                    format_data["bit_rate"] = int(match.group("bitrate")) * 1000
+                continue
+
+            # Метаданные глав и side data потока (displaymatrix и т.п.) пропускаем
+            if _FFMPEG_CHAPTER_RE.match(line) or _FFMPEG_SIDE_DATA_RE.match(line):
+                tags = {}
+                continue
+
+            match = _FFMPEG_STREAM_RE.match(line)
+            if match:
+                stream = cls._parse_ffmpeg_stream(match)
+                streams.append(stream)
+                tags = stream["tags"]
+                continue
+
+            # Строки "ключ : значение" относятся к последнему блоку Metadata
+            match = _FFMPEG_METADATA_RE.match(line)
+            if match and match.group("key") != "Metadata":
+                tags.setdefault(match.group("key"), match.group("value").strip())
+
+        return {"format": format_data, "streams": streams}
+
+    @staticmethod
+    def _parse_ffmpeg_stream(match: re.Match) -> dict:
+        """
+        Разобрать строку "Stream #0:N" из вывода ffmpeg
+
+        Args:
+            match: Результат _FFMPEG_STREAM_RE
+
+        Returns:
+            Словарь в формате потока ffprobe
+        """
+        details = match.group("details")
+        codec_type = match.group("type").lower()
+
+        stream = {
+            "index": int(match.group("index")),
+            "codec_type": codec_type,
+            "codec_name": re.split(r"[\s,]", details, maxsplit=1)[0],
+            "tags": {},
+            "disposition": {
+                key: int(marker in details)
+                for key, marker in _FFMPEG_DISPOSITIONS.items()
+            },
+        }
+
+        if match.group("language"):
+            stream["tags"]["language"] = match.group("language")
+
+        bitrate = _FFMPEG_BITRATE_RE.search(details)
+        if bitrate:
+            stream["bit_rate"] = int(bitrate.group(1)) * 1000
+
+        if codec_type == "video":
+            parts = details.split(", ")
+            if len(parts) > 1:
+                stream["pix_fmt"] = parts[1].split("(")[0].strip()
+
+            size = _FFMPEG_SIZE_RE.search(details)
+            if size:
+                stream["width"] = int(size.group(1))
+                stream["height"] = int(size.group(2))
+
+            fps = _FFMPEG_FPS_RE.search(details)
+            if fps:
+                value = float(fps.group(1)) * (1000 if fps.group(2) else 1)
+                stream["r_frame_rate"] = f"{value:g}"
+
+            dar = _FFMPEG_DAR_RE.search(details)
+            if dar:
+                stream["display_aspect_ratio"] = dar.group(1)
+
+        elif codec_type == "audio":
+            audio = _FFMPEG_AUDIO_RE.search(details)
+            if audio:
+                stream["sample_rate"] = audio.group(1)
+                layout = audio.group(2).strip()
+                stream["channel_layout"] = layout
+                channels = re.match(r"(\d+) channels", layout)
+                if channels:
+                    stream["channels"] = int(channels.group(1))
+                else:
+                    stream["channels"] = _CHANNEL_LAYOUTS.get(layout.split("(")[0])
+
+        return stream
+
+    @staticmethod
+    def _parse_timestamp(value: str) -> Optional[float]:
+        """
+        Парсинг времени вида "HH:MM:SS.ss"
+
+        Args:
+            value: Строка времени
+
+        Returns:
+            Количество секунд или None
+        """
+        try:
+            hours, minutes, seconds = value.split(":")
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        except ValueError:
+            return None
+
+    def probe_files(self, filepaths: List[str]) -> Dict[str, FileInfo]:
+        """
+        Анализировать несколько медиа-файлов
+
+        ffprobe принимает только один входной файл на процесс, поэтому
+        файлы анализируются параллельно через probe_many().
+
+        Args:
+            filepaths: Список путей к файлам
+
+        Returns:
+            Словарь {путь: FileInfo} только для успешно проанализированных файлов
+        """
+        return self.probe_many(filepaths)
+
+    def probe_many(
+        self,
+        filepaths: List[str],
+        max_workers: Optional[int] = None,
+        callback: Optional[Callable[[str, Optional[FileInfo]], None]] = None
+    ) -> Dict[str, FileInfo]:
+        """
+        Параллельно анализировать несколько медиа-файлов
+
+        Args:
+            filepaths: Список путей к файлам (повторы анализируются один раз)
+            max_workers: Количество потоков (по умолчанию max_parallel)
+            callback: Вызывается по завершении анализа каждого файла
+                с аргументами (путь, FileInfo или None) в потоке,
+                из которого вызван probe_many
+
+        Returns:
+            Словарь {путь: FileInfo} только для успешно проанализированных файлов
+        """
+        unique_paths = list(dict.fromkeys(filepaths))
+        results: Dict[str, FileInfo] = {}
+
+        if not unique_paths:
+            return results
+
+        workers = min(max_workers or self.max_parallel, len(unique_paths))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.probe_file, filepath): filepath
+                for filepath in unique_paths
+            }
+
+            for future in as_completed(futures):
+                filepath = futures[future]
+                file_info = future.result()
+
+                if file_info:
+                    results[filepath] = file_info
+
+                if callback:
+                    callback(filepath, file_info)
+
+        logger.info(f"Проанализировано файлов: {len(results)} из {len(unique_paths)}")
+
+        return results
+
     def _parse_file_info(self, filepath: str, data: dict) -> FileInfo:
         """
         Парсинг JSON данных от ffprobe в FileInfo объект
@@ -109,9 +481,9 @@ class FFProbeManager:
 
         # Парсим потоки
         for idx, stream_data in enumerate(streams_data):
-            stream = self._parse_stream_info(idx, stream_data)
+            stream = self._parse_stream_info(stream_data.get("index", idx), stream_data)
             if stream:
-                file_info.streams.append(stream)
+                file_info.add_stream(stream)
 
         # Парсим главы
         file_info.chapters = chapters_data
@@ -252,16 +624,19 @@ class FFProbeManager:
 
         Args:
             filepath: Путь к файлу
-            stream_index: Индекс потока
+            stream_index: Индекс потока (поле index ffprobe)
 
         Returns:
             Словарь с информацией о кодеке или None
         """
         file_info = self.probe_file(filepath)
-        if not file_info or stream_index >= len(file_info.streams):
+        if not file_info:
+            return None
+
+        stream = file_info.streams_by_index.get(stream_index)
+        if stream is None:
             return None
 
-        stream = file_info.streams[stream_index]
         return {
             "codec_name": stream.codec_name,
             "codec_long_name": stream.codec_long_name,
@@ -272,16 +647,17 @@ class FFProbeManager:
         """
         Проверить доступность ffprobe
 
+        Результат кэшируется при создании менеджера, см. invalidate()
+
         Returns:
             True если ffprobe доступен
         """
-        try:
-            result = subprocess.run(
-                [self.ffprobe_path, "-version"],
-                capture_output=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        return self._available
+
+    def invalidate(self):
+        """Заново найти исполняемый файл ffprobe (после смены пути)"""
+        self._binary = shutil.which(self.ffprobe_path)
+        self._available = bool(self._binary)
+
+        if not self._available:
+            logger.warning(f"ffprobe не найден: {self.ffprobe_path}")
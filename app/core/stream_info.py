@@ -174,6 +174,9 @@ class FileInfo:
     # Информация о главах
     chapters: list[Dict[str, Any]] = None
 
+    # Потоки по индексу в файле
+    streams_by_index: Dict[int, StreamInfo] = None
+
     def __post_init__(self):
         """Инициализация после создания"""
         if self.streams is None:
@@ -182,6 +185,17 @@ class FileInfo:
             self.metadata = {}
         if self.chapters is None:
             self.chapters = []
+        self.streams_by_index = {s.index: s for s in self.streams}
+
+    def add_stream(self, stream: StreamInfo):
+        """
+        Добавить поток
+
+        Args:
+            stream: Информация о потоке
+        """
+        self.streams.append(stream)
+        self.streams_by_index[stream.index] = stream
 
     def get_streams_by_type(self, stream_type: StreamType) -> list[StreamInfo]:
         """
@@ -195,6 +209,18 @@ class FileInfo:
         """
         return [s for s in self.streams if s.stream_type == stream_type]
 
+    def partition_streams(self) -> Dict[StreamType, list[StreamInfo]]:
+        """
+        Разбить потоки по типам за один проход
+
+        Returns:
+            Словарь {тип: список потоков}, содержит все типы StreamType
+        """
+        partition: Dict[StreamType, list[StreamInfo]] = {t: [] for t in StreamType}
+        for stream in self.streams:
+            partition[stream.stream_type].append(stream)
+        return partition
+
     def get_video_streams(self) -> list[StreamInfo]:
         """Получить все видео-потоки"""
         return self.get_streams_by_type(StreamType.VIDEO)
@@ -228,9 +254,10 @@ class FileInfo:
         """
         parts = []
 
-        video_count = len(self.get_video_streams())
-        audio_count = len(self.get_audio_streams())
-        subtitle_count = len(self.get_subtitle_streams())
+        partition = self.partition_streams()
+        video_count = len(partition[StreamType.VIDEO])
+        audio_count = len(partition[StreamType.AUDIO])
+        subtitle_count = len(partition[StreamType.SUBTITLE])
 
         if video_count > 0:
             parts.append(f"{video_count} video")
@@ -52,7 +52,10 @@ class MainWindow(QMainWindow):
 
         # Инициализируем FFProbeManager с путем из FFmpegManager
         ffprobe_path = self.ffmpeg_manager.ffprobe_path or "ffprobe"
-        self.ffprobe_manager = FFProbeManager(ffprobe_path)
+        self.ffprobe_manager = FFProbeManager(
+            ffprobe_path,
+            ffmpeg_path=self.ffmpeg_manager.ffmpeg_path or None
+        )
         logger.info(f"FFProbeManager инициализирован с путем: {ffprobe_path}")
         self.conversion_engine = None
         self.conversion_thread = None
@@ -2041,6 +2044,10 @@ class MainWindow(QMainWindow):
                 self.batch_thread.terminate()
                 self.batch_thread.wait()
 
+        # Потоки анализа файлов и загрузки кадров превью
+        self.stream_selector.shutdown()
+        self.video_preview.shutdown()
+
         # Закрываем окно логирования
         if self.logger_widget:
             self.logger_widget.close()
@@ -441,6 +441,19 @@ class ModernTheme:
             padding: 8px;
             font-size: 10px;
         }
+
+        /* Подсказки с параметрами FFmpeg */
+        QLabel#OptionHint {
+            color: gray;
+            font-size: 10px;
+        }
+
+        /* Подсказка автовыбора кодека */
+        QLabel#AutoCodecHint {
+            color: #2196F3;
+            font-size: 9px;
+            padding: 2px;
+        }
         """
 
     def _get_dark_stylesheet(self) -> str:
@@ -880,4 +893,17 @@ class ModernTheme:
             padding: 8px;
             font-size: 10px;
         }
+
+        /* Подсказки с параметрами FFmpeg */
+        QLabel#OptionHint {
+            color: gray;
+            font-size: 10px;
+        }
+
+        /* Подсказка автовыбора кодека */
+        QLabel#AutoCodecHint {
+            color: #2196F3;
+            font-size: 9px;
+            padding: 2px;
+        }
         """
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Попиксельные ядра фильтров превью, скомпилированные Numba
+
+Сигнатуры заданы явно, поэтому ядра компилируются при импорте модуля,
+а не при первом вызове; cache=True сохраняет машинный код на диске,
+и повторные запуски загружают его без компиляции. Без Numba или при
+ошибке компиляции fused_eq равен None, и фильтры считаются через OpenCV.
+"""
+import logging
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+logger = logging.getLogger(__name__)
+
+if njit is not None:
+    # Ошибка компиляции или недоступный для записи каталог кэша
+    # (собранное или установленное только для чтения приложение)
+    # не должны ломать импорт превью - тогда работает путь OpenCV
+    try:
+        @njit("float32(float32)", cache=True)
+        def _clamp_byte(value):
+            """Ограничить значение диапазоном 0..255"""
+            return min(max(value, np.float32(0.0)), np.float32(255.0))
+
+        @njit("void(uint8[:, :, :], float32, float32, float32, uint8[:, :, :])",
+              parallel=True, fastmath=True, cache=True)
+        def fused_eq(rgb, brightness, contrast, saturation, out):
+            """
+            Яркость, контраст и насыщенность RGB кадра за один проход
+
+            Насыщенность меняется без перехода в HSV: при неизменных тоне
+            и яркости (V = max) каждый канал линейно зависит от насыщенности,
+            поэтому канал сдвигается от V с коэффициентом
+            min(saturation, V / (max - min)).
+            """
+            offset = brightness * np.float32(255.0)
+            height, width = rgb.shape[0], rgb.shape[1]
+            for i in prange(height):
+                for j in range(width):
+                    r = _clamp_byte(_clamp_byte(rgb[i, j, 0] + offset) * contrast)
+                    g = _clamp_byte(_clamp_byte(rgb[i, j, 1] + offset) * contrast)
+                    b = _clamp_byte(_clamp_byte(rgb[i, j, 2] + offset) * contrast)
+
+                    if saturation != 1.0:
+                        v = max(r, g, b)
+                        delta = v - min(r, g, b)
+                        if delta > 0:
+                            factor = min(saturation, v / delta)
+                            r = v - (v - r) * factor
+                            g = v - (v - g) * factor
+                            b = v - (v - b) * factor
+
+                    out[i, j, 0] = np.uint8(r + 0.5)
+                    out[i, j, 1] = np.uint8(g + 0.5)
+                    out[i, j, 2] = np.uint8(b + 0.5)
+    except Exception as e:
+        logger.warning(f"Не удалось скомпилировать ядра фильтров Numba: {e}")
+        fused_eq = None
+else:
+    fused_eq = None
@@ -6,25 +6,115 @@ from PySide6.QtWidgets import (
     QListWidget, QListWidgetItem, QPushButton, QLabel,
     QMessageBox, QCheckBox
 )
-from PySide6.QtCore import Qt, Signal
-from typing import Optional, List
+from PySide6.QtCore import Qt, Signal, QThread, QObject, QTimer
+from typing import Optional, List, Dict, Tuple
+from itertools import chain
+import subprocess
+import logging
 
 from core.stream_info import StreamInfo, FileInfo, StreamType
 from core.ffprobe_manager import FFProbeManager
 
+logger = logging.getLogger(__name__)
+
+
+class ProbeWorker(QObject):
+    """Анализ списка файлов через ffprobe в отдельном потоке"""
+
+    file_probed = Signal(int, str, object)  # request_id, filepath, FileInfo или None
+    finished = Signal(int)  # request_id
+
+    def __init__(self, ffprobe_manager: FFProbeManager, filepaths: List[str], request_id: int = 0):
+        super().__init__()
+        self.ffprobe_manager = ffprobe_manager
+        self.filepaths = filepaths
+        self.request_id = request_id
+        self._process: Optional[subprocess.Popen] = None
+        self._cancelled = False
+
+    def run(self):
+        """Запуск анализа"""
+        try:
+            if QThread.currentThread().isInterruptionRequested():
+                return
+
+            if len(self.filepaths) == 1:
+                filepath = self.filepaths[0]
+                file_info = self.ffprobe_manager.probe_file(
+                    filepath,
+                    process_started=self._on_process_started,
+                    is_cancelled=self._is_cancelled
+                )
+                self.file_probed.emit(self.request_id, filepath, file_info)
+            else:
+                self.ffprobe_manager.probe_many(self.filepaths, callback=self._emit_probed)
+        finally:
+            self.finished.emit(self.request_id)
+
+    def cancel(self):
+        """Прервать анализ одного файла (вызывается из GUI потока)"""
+        self._cancelled = True
+        if self._process is not None:
+            self._terminate(self._process)
+
+    def _is_cancelled(self) -> bool:
+        """Был ли анализ прерван"""
+        return self._cancelled
+
+    def _emit_probed(self, filepath: str, file_info: Optional[FileInfo]):
+        """Переслать результат batch анализа"""
+        self.file_probed.emit(self.request_id, filepath, file_info)
+
+    def _on_process_started(self, process: subprocess.Popen):
+        """Запомнить процесс ffprobe, чтобы его можно было прервать"""
+        self._process = process
+        if self._cancelled:
+            self._terminate(process)
+
+    @staticmethod
+    def _terminate(process: subprocess.Popen):
+        """Завершить процесс, если он еще работает"""
+        try:
+            process.terminate()
+        except OSError:
+            pass
+
 
 class StreamSelectorWidget(QWidget):
     """Виджет для выбора потоков из медиа-файла"""
 
+    _FILE_LABEL_TEMPLATE = "Файл: {}\nНажмите 'Анализировать' для получения информации о потоках"
+
     # Сигнал при изменении выбора потоков
     streams_changed = Signal()
 
+    # Сигналы batch анализа
+    file_analyzed = Signal(str, object)  # filepath, FileInfo или None
+    files_analysis_finished = Signal()
+
     def __init__(self, ffprobe_manager: Optional[FFProbeManager] = None, parent=None):
         super().__init__(parent)
 
+        self.current_file: Optional[str] = None
         self.file_info: Optional[FileInfo] = None
+        self._probe_cache: Dict[str, FileInfo] = {}
+        self._probe_thread: Optional[QThread] = None
+        self._probe_worker: Optional[ProbeWorker] = None
+        # Номер последнего запроса анализа: результаты старых запросов отбрасываются
+        self._probe_request_id = 0
+        # Прерванные анализы живут, пока их поток не завершится
+        self._cancelled_probes: Dict[int, Tuple[QThread, ProbeWorker]] = {}
+        self._batch_thread: Optional[QThread] = None
+        self._batch_worker: Optional[ProbeWorker] = None
         self.ffprobe_manager = ffprobe_manager if ffprobe_manager else FFProbeManager()
 
+        # Серия изменений выбора (например, выделение протягиванием)
+        # дает один сигнал streams_changed
+        self._streams_timer = QTimer(self)
+        self._streams_timer.setSingleShot(True)
+        self._streams_timer.setInterval(50)
+        self._streams_timer.timeout.connect(self.streams_changed.emit)
+
         self._init_ui()
 
     def _init_ui(self):
@@ -65,6 +155,7 @@ class StreamSelectorWidget(QWidget):
         streams_layout.addWidget(video_label)
         self.video_list = QListWidget()
         self.video_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
+        self.video_list.setUniformItemSizes(True)
         self.video_list.itemSelectionChanged.connect(self._on_selection_changed)
         self.video_list.setMaximumHeight(100)
         streams_layout.addWidget(self.video_list)
@@ -74,6 +165,7 @@ class StreamSelectorWidget(QWidget):
         streams_layout.addWidget(audio_label)
         self.audio_list = QListWidget()
         self.audio_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
+        self.audio_list.setUniformItemSizes(True)
         self.audio_list.itemSelectionChanged.connect(self._on_selection_changed)
         self.audio_list.setMaximumHeight(100)
         streams_layout.addWidget(self.audio_list)
@@ -83,6 +175,7 @@ class StreamSelectorWidget(QWidget):
         streams_layout.addWidget(subtitle_label)
         self.subtitle_list = QListWidget()
         self.subtitle_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
+        self.subtitle_list.setUniformItemSizes(True)
         self.subtitle_list.itemSelectionChanged.connect(self._on_selection_changed)
         self.subtitle_list.setMaximumHeight(80)
         streams_layout.addWidget(self.subtitle_list)
@@ -114,15 +207,21 @@ class StreamSelectorWidget(QWidget):
         Args:
             filepath: Путь к файлу
         """
+        if filepath == self.current_file:
+            return
+
+        self._cancel_probe()
+
         self.current_file = filepath
         self.analyze_button.setEnabled(bool(filepath))
+        self.analyze_button.setText("🔍 Анализировать файл")
         self.file_info = None
         self._clear_lists()
-        self.file_info_label.setText(f"Файл: {filepath}\nНажмите 'Анализировать' для получения информации о потоках")
+        self.file_info_label.setText(self._FILE_LABEL_TEMPLATE.format(filepath))
 
     def analyze_current_file(self):
         """Анализировать текущий файл"""
-        if not hasattr(self, 'current_file') or not self.current_file:
+        if not self.current_file:
             QMessageBox.warning(self, "Ошибка", "Файл не выбран")
             return
 
@@ -135,64 +234,196 @@ class StreamSelectorWidget(QWidget):
             )
             return
 
-        # Анализируем файл
+        # Файл мог быть уже проанализирован в batch режиме
+        cached = self._probe_cache.pop(self.current_file, None)
+        if cached:
+            self._show_file_info(cached)
+            return
+
+        # Анализируем файл в отдельном потоке
         self.analyze_button.setEnabled(False)
         self.analyze_button.setText("Анализ...")
 
-        try:
-            self.file_info = self.ffprobe_manager.probe_file(self.current_file)
+        self._probe_request_id += 1
+        self._probe_worker = ProbeWorker(
+            self.ffprobe_manager, [self.current_file], self._probe_request_id
+        )
+        self._probe_thread = QThread()
+        self._probe_worker.moveToThread(self._probe_thread)
 
-            if self.file_info:
-                self._populate_stream_lists()
-                self.file_info_label.setText(self.file_info.get_summary())
-            else:
-                QMessageBox.warning(
-                    self,
-                    "Ошибка",
-                    "Не удалось проанализировать файл. Проверьте формат файла."
-                )
-                self.file_info_label.setText("Ошибка анализа файла")
+        self._probe_thread.started.connect(self._probe_worker.run)
+        self._probe_worker.file_probed.connect(self._on_probe_done)
+        self._probe_worker.finished.connect(self._on_probe_finished)
 
-        finally:
-            self.analyze_button.setEnabled(True)
+        self._probe_thread.start()
+
+    def _cancel_probe(self):
+        """Прервать текущий анализ (процесс ffprobe завершается)"""
+        if self._probe_worker is None:
+            return
+
+        self._probe_worker.cancel()
+        self._probe_thread.requestInterruption()
+
+        # Ссылки держим до завершения потока, иначе Qt удалит его во время работы
+        self._cancelled_probes[self._probe_worker.request_id] = (self._probe_thread, self._probe_worker)
+        self._probe_thread = None
+        self._probe_worker = None
+
+        logger.debug("Анализ предыдущего файла прерван")
+
+    def shutdown(self):
+        """Прервать анализ и дождаться завершения всех потоков (при закрытии)"""
+        self._cancel_probe()
+
+        threads = [thread for thread, _ in self._cancelled_probes.values()]
+        if self._batch_thread is not None:
+            self._batch_worker.cancel()
+            self._batch_thread.requestInterruption()
+            threads.append(self._batch_thread)
+
+        # Ссылки остаются в полях: finished уже в очереди GUI потока
+        for thread in threads:
+            thread.quit()
+            thread.wait()
+
+    def _on_probe_done(self, request_id: int, filepath: str, file_info: Optional[FileInfo]):
+        """Обработчик результата анализа текущего файла"""
+        # Результат прерванного или устаревшего запроса
+        if request_id != self._probe_request_id or self._probe_worker is None:
+            return
+
+        if file_info:
+            self._show_file_info(file_info)
+        else:
+            self.file_info = None
+            QMessageBox.warning(
+                self,
+                "Ошибка",
+                "Не удалось проанализировать файл. Проверьте формат файла."
+            )
+            self.file_info_label.setText("Ошибка анализа файла")
+
+    def _on_probe_finished(self, request_id: int):
+        """Обработчик завершения потока анализа"""
+        cancelled = self._cancelled_probes.pop(request_id, None)
+        if cancelled:
+            thread, _ = cancelled
+        else:
+            thread = self._probe_thread
+            self._probe_thread = None
+            self._probe_worker = None
+
+            self.analyze_button.setEnabled(bool(self.current_file))
             self.analyze_button.setText("🔍 Анализировать файл")
 
+        thread.quit()
+        thread.wait()
+
+    def _show_file_info(self, file_info: FileInfo):
+        """Показать информацию о файле и заполнить списки потоков"""
+        self.file_info = file_info
+        self._populate_stream_lists()
+        self.file_info_label.setText(file_info.get_summary())
+
+    def analyze_files(self, filepaths: List[str]):
+        """
+        Заранее проанализировать несколько файлов (batch режим)
+
+        Анализ выполняется параллельно в отдельном потоке. По мере готовности
+        каждого файла испускается file_analyzed, результат сохраняется,
+        и последующий анализ этого файла не запускает ffprobe повторно.
+
+        Args:
+            filepaths: Список путей к файлам
+        """
+        if not filepaths:
+            return
+
+        if self._batch_thread is not None:
+            logger.warning("Batch анализ уже выполняется")
+            return
+
+        self._batch_worker = ProbeWorker(self.ffprobe_manager, filepaths)
+        self._batch_thread = QThread()
+        self._batch_worker.moveToThread(self._batch_thread)
+
+        self._batch_thread.started.connect(self._batch_worker.run)
+        self._batch_worker.file_probed.connect(self._on_file_probed)
+        self._batch_worker.finished.connect(self._on_files_analysis_finished)
+
+        self._batch_thread.start()
+        logger.info(f"Batch анализ запущен: {len(filepaths)} файлов")
+
+    def _on_file_probed(self, request_id: int, filepath: str, file_info: Optional[FileInfo]):
+        """Обработчик завершения анализа одного файла из batch"""
+        if file_info:
+            self._probe_cache[filepath] = file_info
+
+            # Если это текущий файл - сразу показываем потоки
+            if filepath == self.current_file:
+                self._show_file_info(file_info)
+
+        self.file_analyzed.emit(filepath, file_info)
+
+    def _on_files_analysis_finished(self, request_id: int):
+        """Обработчик завершения batch анализа"""
+        self._batch_thread.quit()
+        self._batch_thread.wait()
+        self._batch_thread = None
+        self._batch_worker = None
+        self.files_analysis_finished.emit()
+
     def _populate_stream_lists(self):
         """Заполнить списки потоками"""
         if not self.file_info:
             return
 
-        self._clear_lists()
+        lists = (self.video_list, self.audio_list, self.subtitle_list)
+        partition = self.file_info.partition_streams()
 
-        # Видео потоки
-        for stream in self.file_info.get_video_streams():
-            item = QListWidgetItem(stream.get_display_name())
-            item.setData(Qt.ItemDataRole.UserRole, stream)
-            self.video_list.addItem(item)
-            # Автовыбор первого видео потока
-            if stream.index == 0 or stream.is_default:
-                item.setSelected(True)
+        # Отключаем перерисовку и сигналы на время заполнения
+        for stream_list in lists:
+            stream_list.setUpdatesEnabled(False)
+            stream_list.blockSignals(True)
 
-        # Аудио потоки
-        for stream in self.file_info.get_audio_streams():
-            item = QListWidgetItem(stream.get_display_name())
-            item.setData(Qt.ItemDataRole.UserRole, stream)
-            self.audio_list.addItem(item)
-            # Автовыбор первого или default аудио потока
-            if stream.is_default or (
-                self.audio_list.count() == 1 and not any(
-                    self.audio_list.item(i).isSelected()
-                    for i in range(self.audio_list.count())
-                )
-            ):
-                item.setSelected(True)
+        try:
+            self._clear_lists()
+
+            # Видео потоки
+            for stream in partition[StreamType.VIDEO]:
+                item = QListWidgetItem(stream.get_display_name())
+                item.setData(Qt.ItemDataRole.UserRole, stream.index)
+                self.video_list.addItem(item)
+                # Автовыбор первого видео потока
+                if stream.index == 0 or stream.is_default:
+                    item.setSelected(True)
+
+            # Аудио потоки
+            has_selected = False
+            for stream in partition[StreamType.AUDIO]:
+                item = QListWidgetItem(stream.get_display_name())
+                item.setData(Qt.ItemDataRole.UserRole, stream.index)
+                self.audio_list.addItem(item)
+                # Автовыбор первого или default аудио потока
+                if stream.is_default or not has_selected:
+                    item.setSelected(True)
+                    has_selected = True
+
+            # Субтитры
+            for stream in partition[StreamType.SUBTITLE]:
+                item = QListWidgetItem(stream.get_display_name())
+                item.setData(Qt.ItemDataRole.UserRole, stream.index)
+                self.subtitle_list.addItem(item)
+                # Субтитры не выбираем автоматически
 
-        # Субтитры
-        for stream in self.file_info.get_subtitle_streams():
-            item = QListWidgetItem(stream.get_display_name())
-            item.setData(Qt.ItemDataRole.UserRole, stream)
-            self.subtitle_list.addItem(item)
-            # Субтитры не выбираем автоматически
+        finally:
+            for stream_list in lists:
+                stream_list.blockSignals(False)
+                stream_list.setUpdatesEnabled(True)
+
+        # Одно уведомление вместо сигнала на каждый элемент
+        self._on_selection_changed()
 
     def _clear_lists(self):
         """Очистить все списки"""
@@ -204,7 +435,7 @@ class StreamSelectorWidget(QWidget):
         """Обработчик изменения автовыбора"""
         is_manual = state == Qt.CheckState.Unchecked.value
         self._set_manual_selection_enabled(is_manual)
-        self.streams_changed.emit()
+        self._streams_timer.start()
 
     def _set_manual_selection_enabled(self, enabled: bool):
         """Включить/выключить ручной выбор потоков"""
@@ -215,7 +446,7 @@ class StreamSelectorWidget(QWidget):
     def _on_selection_changed(self):
         """Обработчик изменения выбора"""
         if not self.auto_select_checkbox.isChecked():
-            self.streams_changed.emit()
+            self._streams_timer.start()
 
     def _select_all_streams(self):
         """Выбрать все потоки"""
@@ -236,34 +467,19 @@ class StreamSelectorWidget(QWidget):
         Returns:
             Список StreamInfo объектов
         """
-        if self.auto_select_checkbox.isChecked():
+        if self.auto_select_checkbox.isChecked() or not self.file_info:
             # Автоматический режим - возвращаем пустой список (ffmpeg сам выберет)
             return []
 
-        selected = []
-
-        # Видео
-        for i in range(self.video_list.count()):
-            item = self.video_list.item(i)
-            if item.isSelected():
-                stream = item.data(Qt.ItemDataRole.UserRole)
-                selected.append(stream)
-
-        # Аудио
-        for i in range(self.audio_list.count()):
-            item = self.audio_list.item(i)
-            if item.isSelected():
-                stream = item.data(Qt.ItemDataRole.UserRole)
-                selected.append(stream)
-
-        # Субтитры
-        for i in range(self.subtitle_list.count()):
-            item = self.subtitle_list.item(i)
-            if item.isSelected():
-                stream = item.data(Qt.ItemDataRole.UserRole)
-                selected.append(stream)
-
-        return selected
+        # Элементы хранят только индекс потока, сам StreamInfo берем из file_info.
+        # selectedItems() возвращает элементы в порядке выбора,
+        # а -map должен сохранять порядок потоков в файле
+        streams_by_index = self.file_info.streams_by_index
+        return [
+            streams_by_index[item.data(Qt.ItemDataRole.UserRole)]
+            for stream_list in (self.video_list, self.audio_list, self.subtitle_list)
+            for item in sorted(stream_list.selectedItems(), key=stream_list.row)
+        ]
 
     def is_auto_select(self) -> bool:
         """Проверить, включен ли автовыбор"""
@@ -279,8 +495,6 @@ class StreamSelectorWidget(QWidget):
         if self.is_auto_select():
             return []
 
-        map_options = []
-        for stream in self.get_selected_streams():
-            map_options.extend(["-map", f"0:{stream.index}"])
-
-        return map_options
+        return list(chain.from_iterable(
+            ("-map", f"0:{stream.index}") for stream in self.get_selected_streams()
+        ))
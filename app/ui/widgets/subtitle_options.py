@@ -7,11 +7,12 @@ from PySide6.QtWidgets import (
     QLabel, QComboBox, QCheckBox, QPushButton,
     QRadioButton, QButtonGroup, QFileDialog, QMessageBox
 )
-from PySide6.QtCore import Signal
-from typing import Optional, List
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QStandardItemModel, QStandardItem
+from typing import Optional, List, Dict
 from pathlib import Path
 
-from core.stream_info import StreamInfo, StreamType
+from core.stream_info import StreamInfo
 
 
 class SubtitleOptionsWidget(QWidget):
@@ -20,12 +21,25 @@ class SubtitleOptionsWidget(QWidget):
     # Сигнал при изменении настроек
     options_changed = Signal()
 
+    # Таблица экранирования специальных символов для FFmpeg фильтров
+    _ESCAPE_TABLE = str.maketrans({"\\": "\\\\", ":": "\\:", "'": "\\'"})
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.subtitle_streams: List[StreamInfo] = []
+        self._streams_by_index: Dict[int, StreamInfo] = {}
         self.external_subtitle_file: Optional[str] = None
 
+        # Последняя экранированная строка (исходная, результат)
+        self._escape_cache: Optional[tuple] = None
+
+        # Серия изменений за 50 мс дает один сигнал options_changed
+        self._emit_timer = QTimer(self)
+        self._emit_timer.setSingleShot(True)
+        self._emit_timer.setInterval(50)
+        self._emit_timer.timeout.connect(self.options_changed.emit)
+
         self._init_ui()
 
     def _init_ui(self):
@@ -58,7 +72,7 @@ class SubtitleOptionsWidget(QWidget):
         embedded_label = QLabel("Дорожка:")
         self.subtitle_combo = QComboBox()
         self.subtitle_combo.addItem("(не выбрано)")
-        self.subtitle_combo.currentIndexChanged.connect(self.options_changed.emit)
+        self.subtitle_combo.currentIndexChanged.connect(self._schedule_emit)
 
         embedded_layout.addWidget(embedded_label)
         embedded_layout.addWidget(self.subtitle_combo, 1)
@@ -89,7 +103,6 @@ class SubtitleOptionsWidget(QWidget):
             "Субтитры будут навсегда встроены в видео (нельзя будет отключить)"
         )
         self.burnin_checkbox.stateChanged.connect(self._on_burnin_changed)
-        self.burnin_checkbox.stateChanged.connect(self.options_changed.emit)
         processing_layout.addWidget(self.burnin_checkbox)
 
         # Copy/Convert subtitle stream
@@ -97,7 +110,7 @@ class SubtitleOptionsWidget(QWidget):
         self.copy_stream_checkbox.setToolTip(
             "Субтитры будут скопированы как отдельная дорожка (можно отключить при просмотре)"
         )
-        self.copy_stream_checkbox.stateChanged.connect(self.options_changed.emit)
+        self.copy_stream_checkbox.stateChanged.connect(self._schedule_emit)
         processing_layout.addWidget(self.copy_stream_checkbox)
 
         # Предупреждение о burn-in
@@ -121,7 +134,7 @@ class SubtitleOptionsWidget(QWidget):
         self.fix_duration_checkbox.setToolTip(
             "Автоматически корректирует длительность субтитров (полезно для DVB субтитров)"
         )
-        self.fix_duration_checkbox.stateChanged.connect(self.options_changed.emit)
+        self.fix_duration_checkbox.stateChanged.connect(self._schedule_emit)
         advanced_layout.addWidget(self.fix_duration_checkbox)
 
         advanced_group.setLayout(advanced_layout)
@@ -129,19 +142,31 @@ class SubtitleOptionsWidget(QWidget):
 
         layout.addStretch()
 
+        # Виджеты, изменение которых приводит к options_changed
+        self._signal_sources = (
+            self.mode_group,
+            self.subtitle_combo,
+            self.burnin_checkbox,
+            self.copy_stream_checkbox,
+            self.fix_duration_checkbox,
+        )
+
         # Начальное состояние
         self._update_controls_state()
 
+    def _schedule_emit(self, *args):
+        """Отложенная отправка options_changed (аргументы сигналов игнорируются)"""
+        self._emit_timer.start()
+
     def _on_mode_changed(self):
         """Обработчик изменения режима источника"""
         self._update_controls_state()
-        self.options_changed.emit()
+        self._schedule_emit()
 
     def _on_burnin_changed(self, state):
         """Обработчик изменения burn-in"""
-        from PySide6.QtCore import Qt
-        is_checked = state == Qt.CheckState.Checked.value
-        self.burnin_warning.setVisible(is_checked)
+        self.burnin_warning.setVisible(state == Qt.CheckState.Checked.value)
+        self._schedule_emit()
 
     def _update_controls_state(self):
         """Обновить состояние контролов"""
@@ -167,29 +192,41 @@ class SubtitleOptionsWidget(QWidget):
             self.external_subtitle_file = file_path
             filename = Path(file_path).name
             self.external_file_label.setText(f"Файл: {filename}")
-            self.options_changed.emit()
+            self._schedule_emit()
 
     def set_subtitle_streams(self, streams: List[StreamInfo]):
         """
         Установить список subtitle потоков
 
         Args:
-            streams: Список StreamInfo объектов с субтитрами
+            streams: Список StreamInfo объектов с субтитрами (уже отфильтрованный,
+                например FileInfo.get_subtitle_streams())
         """
-        self.subtitle_streams = [s for s in streams if s.stream_type == StreamType.SUBTITLE]
+        self.subtitle_streams = list(streams)
+        self._streams_by_index = {s.index: s for s in self.subtitle_streams}
 
-        # Обновляем комбобокс
-        self.subtitle_combo.clear()
-        self.subtitle_combo.addItem("(не выбрано)")
+        # Собираем модель целиком, чтобы не вызывать сигналы на каждый элемент
+        model = QStandardItemModel(self.subtitle_combo)
+        model.appendRow(QStandardItem("(не выбрано)"))
 
         for stream in self.subtitle_streams:
-            self.subtitle_combo.addItem(stream.get_display_name(), stream)
+            item = QStandardItem(stream.get_display_name())
+            item.setData(stream.index, Qt.ItemDataRole.UserRole)
+            model.appendRow(item)
 
         # Автоматически выбираем первый default subtitle
-        for i, stream in enumerate(self.subtitle_streams):
-            if stream.is_default:
-                self.subtitle_combo.setCurrentIndex(i + 1)
-                break
+        default_index = next(
+            (i for i, stream in enumerate(self.subtitle_streams) if stream.is_default), -1
+        )
+
+        self.subtitle_combo.blockSignals(True)
+        try:
+            self.subtitle_combo.setModel(model)
+            self.subtitle_combo.setCurrentIndex(default_index + 1)
+        finally:
+            self.subtitle_combo.blockSignals(False)
+
+        self._schedule_emit()
 
     def get_selected_stream(self) -> Optional[StreamInfo]:
         """
@@ -205,7 +242,7 @@ class SubtitleOptionsWidget(QWidget):
         if index <= 0:
             return None
 
-        return self.subtitle_combo.itemData(index)
+        return self._streams_by_index.get(self.subtitle_combo.itemData(index))
 
     def get_ffmpeg_options(self) -> list[str]:
         """
@@ -256,8 +293,7 @@ class SubtitleOptionsWidget(QWidget):
 
         return filters
 
-    @staticmethod
-    def _escape_filter_string(text: str) -> str:
+    def _escape_filter_string(self, text: str) -> str:
         """
         Экранировать строку для использования в FFmpeg фильтре
 
@@ -267,12 +303,17 @@ class SubtitleOptionsWidget(QWidget):
         Returns:
             Экранированная строка
         """
-        # Экранируем специальные символы для FFmpeg фильтров
         text = str(text)
-        text = text.replace("\\", "\\\\")
-        text = text.replace(":", "\\:")
-        text = text.replace("'", "\\'")
-        return text
+
+        # get_filter_options вызывается при каждом изменении настроек
+        # с тем же путем к файлу - повторно не экранируем
+        if self._escape_cache and self._escape_cache[0] == text:
+            return self._escape_cache[1]
+
+        # Экранируем специальные символы за один проход
+        escaped = text.translate(self._ESCAPE_TABLE)
+        self._escape_cache = (text, escaped)
+        return escaped
 
     def is_burnin_enabled(self) -> bool:
         """Проверить, включен ли burn-in"""
@@ -284,11 +325,24 @@ class SubtitleOptionsWidget(QWidget):
 
     def reset(self):
         """Сбросить все настройки"""
-        self.embedded_radio.setChecked(True)
-        self.subtitle_combo.setCurrentIndex(0)
-        self.external_subtitle_file = None
-        self.external_file_label.setText("Файл: не выбран")
-        self.burnin_checkbox.setChecked(False)
-        self.copy_stream_checkbox.setChecked(False)
-        self.fix_duration_checkbox.setChecked(False)
+        # Сигналы блокируем, чтобы options_changed прозвучал один раз
+        for widget in self._signal_sources:
+            widget.blockSignals(True)
+
+        try:
+            self.embedded_radio.setChecked(True)
+            self.subtitle_combo.setCurrentIndex(0)
+            self.external_subtitle_file = None
+            self.external_file_label.setText("Файл: не выбран")
+            self.burnin_checkbox.setChecked(False)
+            self.copy_stream_checkbox.setChecked(False)
+            self.fix_duration_checkbox.setChecked(False)
+        finally:
+            for widget in self._signal_sources:
+                widget.blockSignals(False)
+
+        self.burnin_warning.setVisible(False)
         self._update_controls_state()
+
+        self._emit_timer.stop()
+        self.options_changed.emit()
@@ -2,11 +2,26 @@
 Виджет для настройки времени (обрезка видео)
 Поддержка -ss, -t, -to, -copyts
 """
+from typing import Tuple
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
     QLabel, QTimeEdit, QCheckBox, QRadioButton, QButtonGroup
 )
-from PySide6.QtCore import Qt, QTime, Signal
+from PySide6.QtCore import Qt, QTime, Signal, QTimer
+
+
+# Формат времени для параметров -ss/-t/-to (совпадает с форматом QTimeEdit)
+_TIME_FORMAT = "HH:mm:ss"
+_ZERO_TIME = QTime(0, 0, 0)
+
+# Значение stateChanged для отмеченного чекбокса
+_CHECKED = Qt.CheckState.Checked.value
+
+# Значения полей времени по умолчанию
+_DEFAULT_START_TIME = QTime(0, 0, 0)
+_DEFAULT_DURATION = QTime(0, 1, 0)  # По умолчанию 1 минута
+_DEFAULT_END_TIME = QTime(0, 1, 0)
 
 
 class TimingOptionsWidget(QWidget):
@@ -17,6 +32,14 @@ class TimingOptionsWidget(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+
+        # Серия изменений за один проход цикла событий (например, удержание
+        # стрелки в QTimeEdit) дает один сигнал options_changed
+        self._emit_timer = QTimer(self)
+        self._emit_timer.setSingleShot(True)
+        self._emit_timer.setInterval(0)
+        self._emit_timer.timeout.connect(self.options_changed.emit)
+
         self._init_ui()
 
     def _init_ui(self):
@@ -29,25 +52,21 @@ class TimingOptionsWidget(QWidget):
         trim_layout = QVBoxLayout()
 
         # Начальное время (Start time)
-        start_layout = QHBoxLayout()
         self.start_time_checkbox = QCheckBox("Начать с:")
         self.start_time_checkbox.stateChanged.connect(self._on_start_time_changed)
-        self.start_time_checkbox.stateChanged.connect(self.options_changed.emit)
-
-        self.start_time_edit = QTimeEdit()
-        self.start_time_edit.setDisplayFormat("HH:mm:ss")
-        self.start_time_edit.setTime(QTime(0, 0, 0))
-        self.start_time_edit.setEnabled(False)
-        self.start_time_edit.timeChanged.connect(self.options_changed.emit)
-
-        start_help = QLabel("(-ss параметр)")
-        start_help.setStyleSheet("color: gray; font-size: 10px;")
 
-        start_layout.addWidget(self.start_time_checkbox)
-        start_layout.addWidget(self.start_time_edit)
-        start_layout.addWidget(start_help)
-        start_layout.addStretch()
-        trim_layout.addLayout(start_layout)
+        # Строки полей времени; строки -t и -to начинаются с отступа,
+        # чтобы выровняться под переключателями режима
+        self.start_time_edit, start_row = self._create_time_row(
+            self.start_time_checkbox, _DEFAULT_START_TIME, "-ss"
+        )
+        self.duration_time_edit, duration_row = self._create_time_row(
+            QLabel("   "), _DEFAULT_DURATION, "-t"
+        )
+        self.end_time_edit, end_time_row = self._create_time_row(
+            QLabel("   "), _DEFAULT_END_TIME, "-to"
+        )
+        trim_layout.addLayout(start_row)
 
         # Режим окончания: Длительность или Конечное время
         end_mode_layout = QHBoxLayout()
@@ -59,53 +78,18 @@ class TimingOptionsWidget(QWidget):
         self.end_mode_group.addButton(self.duration_radio)
         self.end_mode_group.addButton(self.end_time_radio)
         self.end_mode_group.buttonClicked.connect(self._on_end_mode_changed)
-        self.end_mode_group.buttonClicked.connect(self.options_changed.emit)
 
         end_mode_layout.addWidget(self.duration_radio)
         end_mode_layout.addWidget(self.end_time_radio)
         end_mode_layout.addStretch()
         trim_layout.addLayout(end_mode_layout)
 
-        # Длительность (-t)
-        duration_layout = QHBoxLayout()
-        duration_label = QLabel("   ")
-        self.duration_time_edit = QTimeEdit()
-        self.duration_time_edit.setDisplayFormat("HH:mm:ss")
-        self.duration_time_edit.setTime(QTime(0, 1, 0))  # По умолчанию 1 минута
-        self.duration_time_edit.setEnabled(False)
-        self.duration_time_edit.timeChanged.connect(self.options_changed.emit)
-
-        duration_help = QLabel("(-t параметр)")
-        duration_help.setStyleSheet("color: gray; font-size: 10px;")
-
-        duration_layout.addWidget(duration_label)
-        duration_layout.addWidget(self.duration_time_edit)
-        duration_layout.addWidget(duration_help)
-        duration_layout.addStretch()
-        trim_layout.addLayout(duration_layout)
-
-        # Конечное время (-to)
-        end_time_layout = QHBoxLayout()
-        end_time_label = QLabel("   ")
-        self.end_time_edit = QTimeEdit()
-        self.end_time_edit.setDisplayFormat("HH:mm:ss")
-        self.end_time_edit.setTime(QTime(0, 1, 0))
-        self.end_time_edit.setEnabled(False)
-        self.end_time_edit.timeChanged.connect(self.options_changed.emit)
-
-        end_time_help = QLabel("(-to параметр)")
-        end_time_help.setStyleSheet("color: gray; font-size: 10px;")
-
-        end_time_layout.addWidget(end_time_label)
-        end_time_layout.addWidget(self.end_time_edit)
-        end_time_layout.addWidget(end_time_help)
-        end_time_layout.addStretch()
-        trim_layout.addLayout(end_time_layout)
+        trim_layout.addLayout(duration_row)
+        trim_layout.addLayout(end_time_row)
 
         # Включение обрезки
         self.enable_trim_checkbox = QCheckBox("Включить обрезку")
         self.enable_trim_checkbox.stateChanged.connect(self._on_trim_enabled_changed)
-        self.enable_trim_checkbox.stateChanged.connect(self.options_changed.emit)
         trim_layout.addWidget(self.enable_trim_checkbox)
 
         trim_group.setLayout(trim_layout)
@@ -120,7 +104,7 @@ class TimingOptionsWidget(QWidget):
         self.copyts_checkbox.setToolTip(
             "Не изменять временные метки, сохранить их как в оригинале"
         )
-        self.copyts_checkbox.stateChanged.connect(self.options_changed.emit)
+        self.copyts_checkbox.stateChanged.connect(self._schedule_emit)
         advanced_layout.addWidget(self.copyts_checkbox)
 
         # Accurate seek
@@ -129,7 +113,7 @@ class TimingOptionsWidget(QWidget):
         self.accurate_seek_checkbox.setToolTip(
             "Точный поиск начальной позиции (медленнее, но точнее)"
         )
-        self.accurate_seek_checkbox.stateChanged.connect(self.options_changed.emit)
+        self.accurate_seek_checkbox.stateChanged.connect(self._schedule_emit)
         advanced_layout.addWidget(self.accurate_seek_checkbox)
 
         advanced_group.setLayout(advanced_layout)
@@ -140,18 +124,54 @@ class TimingOptionsWidget(QWidget):
         # Начальное состояние
         self._update_controls_state()
 
+    def _create_time_row(self, lead: QWidget, default: QTime,
+                         flag: str) -> Tuple[QTimeEdit, QHBoxLayout]:
+        """
+        Создать строку с полем времени и подсказкой параметра FFmpeg
+
+        Args:
+            lead: Виджет в начале строки (чекбокс или отступ)
+            default: Время по умолчанию
+            flag: Параметр FFmpeg для подсказки
+
+        Returns:
+            (поле времени, горизонтальный layout строки)
+        """
+        time_edit = QTimeEdit()
+        time_edit.setDisplayFormat(_TIME_FORMAT)
+        time_edit.setTime(default)
+        time_edit.setEnabled(False)
+        time_edit.timeChanged.connect(self._schedule_emit)
+
+        help_label = QLabel(f"({flag} параметр)")
+        help_label.setObjectName("OptionHint")
+
+        row_layout = QHBoxLayout()
+        row_layout.addWidget(lead)
+        row_layout.addWidget(time_edit)
+        row_layout.addWidget(help_label)
+        row_layout.addStretch()
+        return time_edit, row_layout
+
+    def _schedule_emit(self, *args):
+        """Отложенная отправка options_changed (аргументы сигналов игнорируются)"""
+        self._emit_timer.start()
+
     def _on_start_time_changed(self, state):
         """Обработчик изменения начального времени"""
-        enabled = state == Qt.CheckState.Checked.value
+        enabled = state == _CHECKED
         self.start_time_edit.setEnabled(enabled)
+        self._schedule_emit()
 
     def _on_end_mode_changed(self):
         """Обработчик изменения режима окончания"""
         self._update_controls_state()
+        self._schedule_emit()
 
     def _on_trim_enabled_changed(self, state):
         """Обработчик включения/выключения обрезки"""
         self._update_controls_state()
+        self._schedule_emit()
 
     def _update_controls_state(self):
         """Обновить состояние контролов"""
@@ -183,37 +203,32 @@ class TimingOptionsWidget(QWidget):
             Список параметров командной строки
         """
         options = []
+        add = options.extend
+        trim_enabled = self.enable_trim_checkbox.isChecked()
 
-        if not self.enable_trim_checkbox.isChecked():
-            # Обрезка выключена, но проверяем copyts
-            if self.copyts_checkbox.isChecked():
-                options.append("-copyts")
-            return options
-
-        # Начальное время (-ss)
-        if self.start_time_checkbox.isChecked():
-            start_seconds = self._time_to_seconds(self.start_time_edit.time())
-            if start_seconds > 0:
-                options.extend(["-ss", self._format_time(start_seconds)])
-
-        # Длительность (-t) или Конечное время (-to)
-        if self.duration_radio.isChecked():
-            # Режим длительности
-            duration_seconds = self._time_to_seconds(self.duration_time_edit.time())
-            if duration_seconds > 0:
-                options.extend(["-t", self._format_time(duration_seconds)])
-        else:
-            # Режим конечного времени
-            end_seconds = self._time_to_seconds(self.end_time_edit.time())
-            if end_seconds > 0:
-                options.extend(["-to", self._format_time(end_seconds)])
-
-        # Copy timestamps
+        if trim_enabled:
+            # Начальное время (-ss)
+            if self.start_time_checkbox.isChecked():
+                start_time = self.start_time_edit.time()
+                if start_time != _ZERO_TIME:
+                    add(("-ss", start_time.toString(_TIME_FORMAT)))
+
+            # Длительность (-t) или Конечное время (-to)
+            if self.duration_radio.isChecked():
+                duration = self.duration_time_edit.time()
+                if duration != _ZERO_TIME:
+                    add(("-t", duration.toString(_TIME_FORMAT)))
+            else:
+                end_time = self.end_time_edit.time()
+                if end_time != _ZERO_TIME:
+                    add(("-to", end_time.toString(_TIME_FORMAT)))
+
+        # Copy timestamps (учитывается и при выключенной обрезке)
         if self.copyts_checkbox.isChecked():
             options.append("-copyts")
 
         # Accurate seek (включен по умолчанию в ffmpeg, но можно выключить)
-        if not self.accurate_seek_checkbox.isChecked():
+        if trim_enabled and not self.accurate_seek_checkbox.isChecked():
             options.append("-noaccurate_seek")
 
         return options
@@ -231,22 +246,6 @@ class TimingOptionsWidget(QWidget):
         """
         return time.hour() * 3600 + time.minute() * 60 + time.second()
 
-    @staticmethod
-    def _format_time(seconds: float) -> str:
-        """
-        Форматировать секунды в строку HH:MM:SS
-
-        Args:
-            seconds: Количество секунд
-
-        Returns:
-            Форматированная строка
-        """
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-
     def is_trim_enabled(self) -> bool:
         """Проверить, включена ли обрезка"""
         return self.enable_trim_checkbox.isChecked()
@@ -267,9 +266,9 @@ class TimingOptionsWidget(QWidget):
         """Сбросить все настройки"""
         self.enable_trim_checkbox.setChecked(False)
         self.start_time_checkbox.setChecked(False)
-        self.start_time_edit.setTime(QTime(0, 0, 0))
         self.duration_radio.setChecked(True)
-        self.duration_time_edit.setTime(QTime(0, 1, 0))
-        self.end_time_edit.setTime(QTime(0, 1, 0))
+        self.start_time_edit.setTime(_DEFAULT_START_TIME)
+        self.duration_time_edit.setTime(_DEFAULT_DURATION)
+        self.end_time_edit.setTime(_DEFAULT_END_TIME)
         self.copyts_checkbox.setChecked(False)
         self.accurate_seek_checkbox.setChecked(True)
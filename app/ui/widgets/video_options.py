@@ -1,4 +1,6 @@
-from typing import Optional
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import Optional, Mapping, Tuple
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QComboBox, QSlider, QSpinBox, QCheckBox,
@@ -9,6 +11,100 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Значение stateChanged для отмеченного чекбокса
+_CHECKED = Qt.CheckState.Checked.value
+
+_AUTO_LABEL = "Авто (рекомендуется)"
+
+# Отображаемое имя кодека -> энкодер FFmpeg
+_CODEC_MAP: Mapping[str, str] = MappingProxyType({
+    "H.264 / AVC (libx264)": "libx264",
+    "H.265 / HEVC (libx265)": "libx265",
+    "H.266 / VVC (libvvenc)": "libvvenc",
+    "VP9 (libvpx-vp9)": "libvpx-vp9",
+    "AV1 (libaom-av1)": "libaom-av1",
+    "AV1 (SVT-AV1)": "libsvtav1",
+    "MJPEG (Motion JPEG)": "mjpeg",
+    "Apple ProRes": "prores_ks",
+    "DNxHD / DNxHR": "dnxhd",
+    "JPEG 2000": "jpeg2000",
+    "Theora": "libtheora",
+    "MPEG-2": "mpeg2video",
+    "Copy (без перекодирования)": "copy"
+})
+
+# (отображаемый текст, значение для FFmpeg); None - без изменения
+_RESOLUTIONS = (
+    ("original", None),
+    ("3840x2160 (4K)", "3840x2160"),
+    ("2560x1440 (2K)", "2560x1440"),
+    ("1920x1080 (FHD)", "1920x1080"),
+    ("1280x720 (HD)", "1280x720"),
+    ("854x480 (SD)", "854x480"),
+)
+
+# (отображаемый текст, значение для FFmpeg)
+_ASPECT_RATIOS = (
+    ("16:9 (широкоэкранный)", "16:9"),
+    ("4:3 (стандартный)", "4:3"),
+    ("21:9 (ультраширокий)", "21:9"),
+    ("1:1 (квадратный)", "1:1"),
+    ("9:16 (вертикальный)", "9:16"),
+)
+
+_PIXEL_FORMATS = (
+    ("yuv420p (стандарт)", "yuv420p"),
+    ("yuv422p (профессиональный)", "yuv422p"),
+    ("yuv444p (без потерь цвета)", "yuv444p"),
+    ("yuv420p10le (10-bit HDR)", "yuv420p10le"),
+    ("rgb24 (RGB без сжатия)", "rgb24"),
+)
+
+
+@lru_cache(maxsize=8)
+def _build_keyframe_expr(interval: int, chapters: bool) -> str:
+    """
+    Собрать выражение для -force_key_frames
+
+    Args:
+        interval: Интервал между ключевыми кадрами в секундах
+        chapters: Добавлять ключевые кадры в начале глав
+
+    Returns:
+        Строка для FFmpeg
+    """
+    # expr:gte(t,n_forced*interval)
+    keyframe_expr = f"expr:gte(t,n_forced*{interval})"
+    if chapters:
+        # Добавляем главы: "chapters-0.1,expr:..."
+        keyframe_expr = f"chapters-0.1,{keyframe_expr}"
+    return keyframe_expr
+
+
+# Справка по кодекам для диалога "ℹ"
+_CODEC_INFO_HTML = (
+    "<h3>Информация о кодеках</h3>"
+    "<table border='1' cellpadding='5' style='border-collapse: collapse;'>"
+    "<tr><th>Кодек</th><th>Сжатие</th><th>Скорость</th><th>Совместимость</th><th>GPU</th></tr>"
+    "<tr><td><b>H.264</b></td><td>★★★★☆</td><td>★★★★★</td><td>★★★★★</td><td>★★★★★</td></tr>"
+    "<tr><td><b>H.265</b></td><td>★★★★★</td><td>★★★☆☆</td><td>★★★☆☆</td><td>★★★★☆</td></tr>"
+    "<tr><td><b>VP9</b></td><td>★★★★☆</td><td>★★★☆☆</td><td>★★★★☆</td><td>★★★☆☆</td></tr>"
+    "<tr><td><b>AV1 (libaom)</b></td><td>★★★★★</td><td>★★☆☆☆</td><td>★★★★☆</td><td>★★★☆☆</td></tr>"
+    "<tr><td><b>AV1 (SVT-AV1)</b></td><td>★★★★★</td><td>★★★★☆</td><td>★★★★☆</td><td>★★★★☆</td></tr>"
+    "</table>"
+    "<br>"
+    "<b>Рекомендации по выбору:</b><br>"
+    "• <b>Универсальность</b>: H.264 - работает везде<br>"
+    "• <b>Качество/Размер</b>: H.265 или AV1 - лучшее сжатие<br>"
+    "• <b>Скорость</b>: H.264 или SVT-AV1 - быстрые энкодеры<br>"
+    "• <b>Баланс</b>: SVT-AV1 - отличное сжатие + высокая скорость<br>"
+    "• <b>WebM контейнер</b>: VP9 или AV1<br>"
+    "• <b>Архивирование</b>: H.265 или AV1<br>"
+    "<br>"
+    "<b>Режим Авто:</b> автоматически выбирает оптимальный кодек<br>"
+    "на основе контейнера, GPU возможностей и цели конвертации."
+)
+
 
 class VideoOptions(QWidget):
     """Виджет настроек видео с автовыбором"""
@@ -19,6 +115,7 @@ class VideoOptions(QWidget):
         super().__init__()
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.auto_codec_mode = False
+        self._codec_info_dialog = None  # Создается при первом открытии справки
         self._init_ui()
         
     def _init_ui(self):
@@ -40,23 +137,8 @@ class VideoOptions(QWidget):
         
         codec_layout = QHBoxLayout()
         self.codec_combo = QComboBox()
-        self.codec_combo.addItems([
-            "Авто (рекомендуется)",
-            "H.264 / AVC (libx264)",
-            "H.265 / HEVC (libx265)",
-            "H.266 / VVC (libvvenc)",
-            "VP9 (libvpx-vp9)",
-            "AV1 (libaom-av1)",
-            "AV1 (SVT-AV1)",
-            "MJPEG (Motion JPEG)",
-            "Apple ProRes",
-            "DNxHD / DNxHR",
-            "JPEG 2000",
-            "Theora",
-            "MPEG-2",
-            "Copy (без перекодирования)"
-        ])
-        self.codec_combo.setCurrentText("Авто (рекомендуется)")
+        self.codec_combo.addItems([_AUTO_LABEL, *_CODEC_MAP])
+        self.codec_combo.setCurrentText(_AUTO_LABEL)
         self.codec_combo.setToolTip(
             "Видео кодек:\n"
             "• Авто - автоматический выбор лучшего кодека\n"
@@ -90,13 +172,7 @@ class VideoOptions(QWidget):
         row += 1
         self.auto_codec_label = QLabel("")
         self.auto_codec_label.setWordWrap(True)
-        self.auto_codec_label.setStyleSheet("""
-            QLabel {
-                color: #2196F3;
-                font-size: 9px;
-                padding: 2px;
-            }
-        """)
+        self.auto_codec_label.setObjectName("AutoCodecHint")
         self.auto_codec_label.setVisible(False)
         group_layout.addWidget(self.auto_codec_label, row, 1)
         
@@ -119,8 +195,12 @@ class VideoOptions(QWidget):
         self.crf_spinbox.setMinimum(0)
         self.crf_spinbox.setMaximum(51)
         self.crf_spinbox.setValue(23)
-        self.crf_slider.valueChanged.connect(self.crf_spinbox.setValue)
-        self.crf_spinbox.valueChanged.connect(self.crf_slider.setValue)
+        self.crf_slider.valueChanged.connect(
+            lambda value: self._set_crf(value, self.crf_slider)
+        )
+        self.crf_spinbox.valueChanged.connect(
+            lambda value: self._set_crf(value, self.crf_spinbox)
+        )
         crf_layout.addWidget(self.crf_slider)
         crf_layout.addWidget(self.crf_spinbox)
         group_layout.addLayout(crf_layout, row, 1)
@@ -147,14 +227,8 @@ class VideoOptions(QWidget):
         row += 1
         group_layout.addWidget(QLabel("Разрешение:"), row, 0)
         self.resolution_combo = QComboBox()
-        self.resolution_combo.addItems([
-            "original",
-            "3840x2160 (4K)",
-            "2560x1440 (2K)",
-            "1920x1080 (FHD)",
-            "1280x720 (HD)",
-            "854x480 (SD)"
-        ])
+        for display, value in _RESOLUTIONS:
+            self.resolution_combo.addItem(display, value)
         self.resolution_combo.setToolTip(
             "Разрешение видео:\n"
             "• original - без изменения\n"
@@ -190,23 +264,12 @@ class VideoOptions(QWidget):
 
         # === НОВЫЕ ОПЦИИ ===
 
-        # Aspect Ratio
+        # Aspect Ratio: чекбокс включает выпадающий список
         row += 1
-        self.aspect_checkbox = QCheckBox("Переопределить Aspect Ratio:")
-        self.aspect_checkbox.setToolTip("Изменить соотношение сторон видео")
-        self.aspect_checkbox.stateChanged.connect(self._on_aspect_changed)
-        group_layout.addWidget(self.aspect_checkbox, row, 0)
-
-        self.aspect_combo = QComboBox()
-        self.aspect_combo.addItems([
-            "16:9 (широкоэкранный)",
-            "4:3 (стандартный)",
-            "21:9 (ультраширокий)",
-            "1:1 (квадратный)",
-            "9:16 (вертикальный)"
-        ])
-        self.aspect_combo.setEnabled(False)
-        self.aspect_combo.setToolTip(
+        self.aspect_checkbox, self.aspect_combo = self._add_check_combo_row(
+            group_layout, row, "Переопределить Aspect Ratio:",
+            "Изменить соотношение сторон видео",
+            _ASPECT_RATIOS,
             "Aspect Ratio (соотношение сторон):\n"
             "• 16:9 - стандарт для HD/Full HD\n"
             "• 4:3 - старый стандарт\n"
@@ -214,25 +277,13 @@ class VideoOptions(QWidget):
             "• 1:1 - Instagram квадрат\n"
             "• 9:16 - вертикальное видео (TikTok/Stories)"
         )
-        group_layout.addWidget(self.aspect_combo, row, 1)
 
         # Pixel Format
         row += 1
-        self.pix_fmt_checkbox = QCheckBox("Pixel Format:")
-        self.pix_fmt_checkbox.setToolTip("Формат представления пикселей")
-        self.pix_fmt_checkbox.stateChanged.connect(self._on_pixfmt_changed)
-        group_layout.addWidget(self.pix_fmt_checkbox, row, 0)
-
-        self.pix_fmt_combo = QComboBox()
-        self.pix_fmt_combo.addItems([
-            "yuv420p (стандарт)",
-            "yuv422p (профессиональный)",
-            "yuv444p (без потерь цвета)",
-            "yuv420p10le (10-bit HDR)",
-            "rgb24 (RGB без сжатия)"
-        ])
-        self.pix_fmt_combo.setEnabled(False)
-        self.pix_fmt_combo.setToolTip(
+        self.pix_fmt_checkbox, self.pix_fmt_combo = self._add_check_combo_row(
+            group_layout, row, "Pixel Format:",
+            "Формат представления пикселей",
+            _PIXEL_FORMATS,
             "Pixel Format:\n"
             "• yuv420p - стандарт, максимальная совместимость\n"
             "• yuv422p - для профессиональной работы\n"
@@ -240,34 +291,29 @@ class VideoOptions(QWidget):
             "• yuv420p10le - для 10-bit HDR видео\n"
             "• rgb24 - без сжатия (огромный размер)"
         )
-        group_layout.addWidget(self.pix_fmt_combo, row, 1)
 
         # Force Keyframes
         row += 1
-        self.keyframes_checkbox = QCheckBox("Принудительные ключевые кадры:")
-        self.keyframes_checkbox.setToolTip(
-            "Вставлять ключевые кадры через заданный интервал\n"
-            "Полезно для потокового видео и точного seeking"
-        )
-        self.keyframes_checkbox.stateChanged.connect(self._on_keyframes_changed)
-        group_layout.addWidget(self.keyframes_checkbox, row, 0)
-
         keyframes_layout = QHBoxLayout()
         self.keyframes_interval = QSpinBox()
         self.keyframes_interval.setMinimum(1)
         self.keyframes_interval.setMaximum(300)
         self.keyframes_interval.setValue(2)
         self.keyframes_interval.setSuffix(" сек")
-        self.keyframes_interval.setEnabled(False)
         self.keyframes_interval.setToolTip("Интервал между ключевыми кадрами в секундах")
         keyframes_layout.addWidget(self.keyframes_interval)
 
         self.keyframes_chapters = QCheckBox("В начале глав")
-        self.keyframes_chapters.setEnabled(False)
         self.keyframes_chapters.setToolTip("Вставлять ключевые кадры в начале каждой главы")
         keyframes_layout.addWidget(self.keyframes_chapters)
         keyframes_layout.addStretch()
 
+        self.keyframes_checkbox = self._add_checkbox_row(
+            group_layout, row, "Принудительные ключевые кадры:",
+            "Вставлять ключевые кадры через заданный интервал\n"
+            "Полезно для потокового видео и точного seeking",
+            self.keyframes_interval, self.keyframes_chapters
+        )
         group_layout.addLayout(keyframes_layout, row, 1)
 
         group_layout.setRowStretch(row + 1, 1)
@@ -275,7 +321,7 @@ class VideoOptions(QWidget):
     
     def _on_codec_changed(self, text: str):
         """Обработка смены кодека"""
-        if text == "Авто (рекомендуется)":
+        if text == _AUTO_LABEL:
             self.auto_codec_mode = True
             self.auto_codec_label.setVisible(True)
             logger.info("Включен режим автовыбора кодека")
@@ -283,25 +329,78 @@ class VideoOptions(QWidget):
             self.auto_codec_mode = False
             self.auto_codec_label.setVisible(False)
 
-    def _on_aspect_changed(self, state):
-        """Обработчик изменения aspect ratio"""
-        from PySide6.QtCore import Qt
-        enabled = state == Qt.CheckState.Checked.value
-        self.aspect_combo.setEnabled(enabled)
-
-    def _on_pixfmt_changed(self, state):
-        """Обработчик изменения pixel format"""
-        from PySide6.QtCore import Qt
-        enabled = state == Qt.CheckState.Checked.value
-        self.pix_fmt_combo.setEnabled(enabled)
-
-    def _on_keyframes_changed(self, state):
-        """Обработчик изменения force keyframes"""
-        from PySide6.QtCore import Qt
-        enabled = state == Qt.CheckState.Checked.value
-        self.keyframes_interval.setEnabled(enabled)
-        self.keyframes_chapters.setEnabled(enabled)
-    
+    def _set_crf(self, value: int, source):
+        """
+        Синхронизировать ползунок и поле CRF без ответного сигнала
+
+        Args:
+            value: Новое значение CRF
+            source: Виджет, в котором изменилось значение
+        """
+        peer = self.crf_spinbox if source is self.crf_slider else self.crf_slider
+        peer.blockSignals(True)
+        peer.setValue(value)
+        peer.blockSignals(False)
+
+    def _add_checkbox_row(self, layout: QGridLayout, row: int, label: str,
+                          tooltip: str, *widgets: QWidget) -> QCheckBox:
+        """
+        Добавить чекбокс, включающий связанные виджеты
+
+        Args:
+            layout: Сетка группы
+            row: Номер строки
+            label: Текст чекбокса
+            tooltip: Подсказка чекбокса
+            widgets: Виджеты, доступные только при отмеченном чекбоксе
+                (размещаются в сетке вызывающим кодом)
+
+        Returns:
+            Созданный чекбокс
+        """
+        checkbox = QCheckBox(label)
+        checkbox.setToolTip(tooltip)
+        checkbox.stateChanged.connect(partial(self._toggle_enabled, widgets))
+        layout.addWidget(checkbox, row, 0)
+
+        for widget in widgets:
+            widget.setEnabled(False)
+        return checkbox
+
+    def _add_check_combo_row(self, layout: QGridLayout, row: int, label: str,
+                             checkbox_tooltip: str, items, combo_tooltip: str
+                             ) -> Tuple[QCheckBox, QComboBox]:
+        """
+        Добавить чекбокс, включающий выпадающий список
+
+        Args:
+            layout: Сетка группы
+            row: Номер строки
+            label: Текст чекбокса
+            checkbox_tooltip: Подсказка чекбокса
+            items: Элементы списка (отображаемый текст, значение)
+            combo_tooltip: Подсказка списка
+
+        Returns:
+            (чекбокс, выпадающий список)
+        """
+        combo = QComboBox()
+        for display, value in items:
+            combo.addItem(display, value)
+        combo.setToolTip(combo_tooltip)
+
+        # Чекбокс добавляется в сетку первым - он раньше списка в порядке Tab
+        checkbox = self._add_checkbox_row(layout, row, label, checkbox_tooltip, combo)
+        layout.addWidget(combo, row, 1)
+        return checkbox, combo
+
+    @staticmethod
+    def _toggle_enabled(widgets, state):
+        """Включить/выключить виджеты по состоянию чекбокса"""
+        enabled = state == _CHECKED
+        for widget in widgets:
+            widget.setEnabled(enabled)
+
     def set_auto_selected_codec(self, codec_name: str, reason: str):
         """Установить автоматически выбранный кодек"""
         if self.auto_codec_mode:
@@ -312,59 +411,21 @@ class VideoOptions(QWidget):
     
     def _show_codec_info(self):
         """Показать информацию о кодеках"""
-        info = (
-            "<h3>Информация о кодеках</h3>"
-            "<table border='1' cellpadding='5' style='border-collapse: collapse;'>"
-            "<tr><th>Кодек</th><th>Сжатие</th><th>Скорость</th><th>Совместимость</th><th>GPU</th></tr>"
-            "<tr><td><b>H.264</b></td><td>★★★★☆</td><td>★★★★★</td><td>★★★★★</td><td>★★★★★</td></tr>"
-            "<tr><td><b>H.265</b></td><td>★★★★★</td><td>★★★☆☆</td><td>★★★☆☆</td><td>★★★★☆</td></tr>"
-            "<tr><td><b>VP9</b></td><td>★★★★☆</td><td>★★★☆☆</td><td>★★★★☆</td><td>★★★☆☆</td></tr>"
-            "<tr><td><b>AV1 (libaom)</b></td><td>★★★★★</td><td>★★☆☆☆</td><td>★★★★☆</td><td>★★★☆☆</td></tr>"
-            "<tr><td><b>AV1 (SVT-AV1)</b></td><td>★★★★★</td><td>★★★★☆</td><td>★★★★☆</td><td>★★★★☆</td></tr>"
-            "</table>"
-            "<br>"
-            "<b>Рекомендации по выбору:</b><br>"
-            "• <b>Универсальность</b>: H.264 - работает везде<br>"
-            "• <b>Качество/Размер</b>: H.265 или AV1 - лучшее сжатие<br>"
-            "• <b>Скорость</b>: H.264 или SVT-AV1 - быстрые энкодеры<br>"
-            "• <b>Баланс</b>: SVT-AV1 - отличное сжатие + высокая скорость<br>"
-            "• <b>WebM контейнер</b>: VP9 или AV1<br>"
-            "• <b>Архивирование</b>: H.265 или AV1<br>"
-            "<br>"
-            "<b>Режим Авто:</b> автоматически выбирает оптимальный кодек<br>"
-            "на основе контейнера, GPU возможностей и цели конвертации."
-        )
-        
-        msg = QMessageBox(self)
-        msg.setWindowTitle("Информация о кодеках")
-        msg.setTextFormat(Qt.RichText)
-        msg.setText(info)
-        msg.setIcon(QMessageBox.Information)
-        msg.exec()
+        if self._codec_info_dialog is None:
+            msg = QMessageBox(self)
+            msg.setWindowTitle("Информация о кодеках")
+            msg.setTextFormat(Qt.RichText)
+            msg.setText(_CODEC_INFO_HTML)
+            msg.setIcon(QMessageBox.Information)
+            self._codec_info_dialog = msg
+        self._codec_info_dialog.exec()
     
     def get_video_codec(self) -> str:
         """Получить видео кодек"""
         codec_text = self.codec_combo.currentText()
-
-        if codec_text == "Авто (рекомендуется)":
+        if codec_text == _AUTO_LABEL:
             return "auto"
-
-        codec_map = {
-            "H.264 / AVC (libx264)": "libx264",
-            "H.265 / HEVC (libx265)": "libx265",
-            "H.266 / VVC (libvvenc)": "libvvenc",
-            "VP9 (libvpx-vp9)": "libvpx-vp9",
-            "AV1 (libaom-av1)": "libaom-av1",
-            "AV1 (SVT-AV1)": "libsvtav1",
-            "MJPEG (Motion JPEG)": "mjpeg",
-            "Apple ProRes": "prores_ks",
-            "DNxHD / DNxHR": "dnxhd",
-            "JPEG 2000": "jpeg2000",
-            "Theora": "libtheora",
-            "MPEG-2": "mpeg2video",
-            "Copy (без перекодирования)": "copy"
-        }
-        return codec_map.get(codec_text, "libx264")
+        return _CODEC_MAP.get(codec_text, "libx264")
     
     def is_auto_mode(self) -> bool:
         """Проверка режима авто"""
@@ -385,10 +446,7 @@ class VideoOptions(QWidget):
     
     def get_resolution(self) -> Optional[str]:
         """Получить разрешение"""
-        res = self.resolution_combo.currentText()
-        if res == "original":
-            return None
-        return res.split()[0]
+        return self.resolution_combo.currentData()
     
     def get_bitrate(self) -> Optional[str]:
         """Получить битрейт"""
@@ -409,9 +467,7 @@ class VideoOptions(QWidget):
         if not self.aspect_checkbox.isChecked():
             return None
 
-        aspect_text = self.aspect_combo.currentText()
-        # Извлекаем только соотношение (до пробела)
-        return aspect_text.split()[0]
+        return self.aspect_combo.currentData()
 
     def get_pixel_format(self) -> Optional[str]:
         """
@@ -423,9 +479,7 @@ class VideoOptions(QWidget):
         if not self.pix_fmt_checkbox.isChecked():
             return None
 
-        pix_fmt_text = self.pix_fmt_combo.currentText()
-        # Извлекаем только формат (до пробела)
-        return pix_fmt_text.split()[0]
+        return self.pix_fmt_combo.currentData()
 
     def get_force_keyframes(self) -> Optional[str]:
         """
@@ -437,16 +491,7 @@ class VideoOptions(QWidget):
         if not self.keyframes_checkbox.isChecked():
             return None
 
-        # Интервал в секундах
-        interval = self.keyframes_interval.value()
-
-        # Формируем expression для FFmpeg
-        # expr:gte(t,n_forced*interval)
-        keyframe_expr = f"expr:gte(t,n_forced*{interval})"
-
-        # Если также выбраны главы
-        if self.keyframes_chapters.isChecked():
-            # Добавляем главы: "chapters-0.1,expr:..."
-            keyframe_expr = f"chapters-0.1,{keyframe_expr}"
-
-        return keyframe_expr
\ No newline at end of file
+        return _build_keyframe_expr(
+            self.keyframes_interval.value(),
+            self.keyframes_chapters.isChecked()
+        )
\ No newline at end of file
@@ -1,10 +1,13 @@
 """
 Виджет видео-превью с поддержкой воспроизведения и live preview фильтров
 """
+import os
 import cv2
 import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 import logging
 
 from PySide6.QtWidgets import (
@@ -15,71 +18,581 @@ from PySide6.QtCore import Qt, QTimer, Signal, QThread, QObject
 from PySide6.QtGui import QImage, QPixmap, QPainter, QPen
 from PIL import Image
 
+from ._filter_kernels import fused_eq
+
+# PyAV держит контейнер открытым и ищет по ключевым кадрам заметно быстрее,
+# чем cv2.VideoCapture, но не обязателен: без него используется OpenCV
+try:
+    import av
+except ImportError:
+    av = None
+
 logger = logging.getLogger(__name__)
 
+# Переход вперед не более чем на столько кадров выполняется последовательным
+# чтением без seek (seek заново декодирует от ключевого кадра)
+SEQUENTIAL_READ_LIMIT = 30
+
+# Задержка перед seek при перетаскивании ползунка (мс): промежуточные
+# позиции отбрасываются, декодируется только последняя
+SEEK_DEBOUNCE_MS = 80
+
+# Фильтры, которые рисуют прямо в переданном кадре; остальные возвращают
+# новый массив (или view, как crop, hflip и vflip)
+_INPLACE_FILTERS = frozenset({'drawtext'})
+
+# Фильтры с параметрами в пикселях исходного кадра (координаты или
+# итоговый размер): с ними кадр не уменьшается до размера превью
+_COORDINATE_FILTERS = frozenset({'crop', 'drawtext', 'scale', 'scale_advanced'})
+
+# Кадр уменьшается до размера превью перед фильтрами, только если
+# выигрыш больше 10%
+PREVIEW_DOWNSCALE_THRESHOLD = 0.9
+
+# Бюджет памяти LRU-кэша декодированных кадров (байт) и минимальный размер
+FRAME_CACHE_BYTES = 256 * 1024 * 1024
+FRAME_CACHE_MIN_ENTRIES = 8
+
+
+@lru_cache(maxsize=16)
+def _rotation_matrix(angle: float, width: int, height: int) -> np.ndarray:
+    """
+    Матрица поворота кадра вокруг центра
+
+    Args:
+        angle: Угол в градусах
+        width: Ширина кадра
+        height: Высота кадра
+
+    Returns:
+        Матрица 2x3 для cv2.warpAffine (не изменять - она кэшируется)
+    """
+    center = (width // 2, height // 2)
+    return cv2.getRotationMatrix2D(center, angle, 1.0)
+
+
+@lru_cache(maxsize=16)
+def _eq_lut(brightness: float, contrast: float) -> np.ndarray:
+    """
+    Таблица яркости и контраста для cv2.LUT
+
+    Args:
+        brightness: Яркость (-1.0..1.0)
+        contrast: Контраст (множитель)
+
+    Returns:
+        Таблица из 256 значений uint8 (не изменять - она кэшируется)
+    """
+    values = np.clip(np.arange(256, dtype=np.float32) + brightness * 255, 0, 255)
+    return np.clip(np.rint(values) * contrast, 0, 255).round().astype(np.uint8)
+
+
+# Цвета текста drawtext (RGB)
+_TEXT_COLORS = {
+    'white': (255, 255, 255),
+    'black': (0, 0, 0),
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'blue': (0, 0, 255),
+    'yellow': (255, 255, 0)
+}
+
+# Толщина линий текста drawtext
+_TEXT_THICKNESS = 2
+
+
+@lru_cache(maxsize=16)
+def _text_sprite(text: str, font_scale: float,
+                 color: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Отрисованный текст для наложения на кадр
+
+    Текст рисуется один раз в маску прозрачности; при воспроизведении
+    кадры только смешиваются с ней, без повторной растеризации глифов.
+
+    Args:
+        text: Текст
+        font_scale: Масштаб шрифта cv2.FONT_HERSHEY_SIMPLEX
+        color: Цвет текста (RGB)
+
+    Returns:
+        (цвет, умноженный на прозрачность, 1 - прозрачность, смещение
+        базовой линии по x, по y) - массивы float32 формы (h, w, 3)
+        и (h, w, 1) (не изменять - они кэшируются)
+    """
+    (text_width, text_height), baseline = cv2.getTextSize(
+        text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, _TEXT_THICKNESS)
+    # Запас под толщину линий и сглаживание
+    pad = _TEXT_THICKNESS + 1
+    mask = np.zeros((text_height + baseline + 2 * pad, text_width + 2 * pad), dtype=np.uint8)
+    cv2.putText(mask, text, (pad, pad + text_height), cv2.FONT_HERSHEY_SIMPLEX,
+                font_scale, 255, _TEXT_THICKNESS, cv2.LINE_AA)
+
+    alpha = mask[:, :, np.newaxis].astype(np.float32) / 255
+    colored = alpha * np.array(color, dtype=np.float32)
+    return colored, 1 - alpha, pad, pad + text_height
+
+
+class VideoReader:
+    """Чтение кадров видео по номеру (PyAV, при отсутствии - OpenCV)"""
+
+    def __init__(self, video_path: str):
+        """
+        Открыть видео
+
+        Args:
+            video_path: Путь к видеофайлу
+        """
+        self.video_path = video_path
+        self.fps = 0.0
+        self.total_frames = 0
+        self.width = 0
+        self.height = 0
+
+        self._container = None
+        self._stream = None
+        self._frames = None  # Итератор декодирования после последнего seek
+        self._last_pos = -1
+        self._capture: Optional[cv2.VideoCapture] = None
+
+        if av is not None:
+            try:
+                self._open_av()
+                return
+            except Exception as e:
+                logger.warning(f"PyAV не смог открыть видео, используется OpenCV: {e}")
+                self._close_av()
+
+        self._open_cv()
+
+    def _open_av(self):
+        """Открыть видео через PyAV"""
+        self._container = av.open(self.video_path)
+        self._stream = self._container.streams.video[0]
+        # Многопоточное декодирование; 0 - число потоков выбирает FFmpeg
+        self._stream.thread_type = "AUTO"
+        self._stream.codec_context.thread_count = 0
+
+        rate = self._stream.average_rate or self._stream.guessed_rate
+        self.fps = float(rate) if rate else 0.0
+        self.width = self._stream.codec_context.width
+        self.height = self._stream.codec_context.height
+
+        self.total_frames = self._stream.frames
+        if not self.total_frames and self.fps > 0:
+            # Контейнер не хранит число кадров - оцениваем по длительности
+            if self._stream.duration:
+                seconds = float(self._stream.duration * self._stream.time_base)
+            else:
+                seconds = (self._container.duration or 0) / av.time_base
+            self.total_frames = int(seconds * self.fps)
+
+    def _open_cv(self):
+        """Открыть видео через OpenCV"""
+        self._capture = cv2.VideoCapture(self.video_path)
+        if not self._capture.isOpened():
+            return
+
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(self._capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    @property
+    def duration(self) -> float:
+        """Длительность в секундах"""
+        return self.total_frames / self.fps if self.fps > 0 else 0
+
+    def is_opened(self) -> bool:
+        """Проверить, открыто ли видео"""
+        if self._container is not None:
+            return True
+        return self._capture is not None and self._capture.isOpened()
+
+    def read(self, frame_position: int) -> Optional[np.ndarray]:
+        """
+        Прочитать кадр по номеру
+
+        Args:
+            frame_position: Номер кадра
+
+        Returns:
+            Кадр в RGB или None при ошибке
+        """
+        if self._container is not None:
+            try:
+                return self._read_av(frame_position)
+            except Exception as e:
+                logger.error(f"Ошибка чтения фрейма {frame_position}: {e}", exc_info=True)
+                self._frames = None
+                self._last_pos = -1
+                return None
+
+        if self._capture is None:
+            return None
+
+        delta = frame_position - self._last_pos
+        if 0 < delta <= SEQUENTIAL_READ_LIMIT:
+            # Пропускаемые кадры только захватываем, без retrieve
+            for _ in range(delta - 1):
+                self._capture.grab()
+        else:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, frame_position)
+
+        ret, frame = self._capture.read()
+        if not ret:
+            self._last_pos = -1
+            return None
+
+        self._last_pos = frame_position
+        # Кадр от read() новый - переставляем каналы на месте
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+
+    def _read_av(self, frame_position: int) -> Optional[np.ndarray]:
+        """Прочитать кадр через PyAV"""
+        frame = None
+        delta = frame_position - self._last_pos
+
+        if 0 < delta <= SEQUENTIAL_READ_LIMIT and self._frames is not None:
+            # Кадр немного впереди - продолжаем декодирование без seek
+            for _ in range(delta):
+                frame = next(self._frames, None)
+                if frame is None:
+                    break
+        else:
+            time_base = self._stream.time_base
+            start = self._stream.start_time or 0
+            target_pts = start
+            if self.fps > 0:
+                target_pts += int(frame_position / self.fps / time_base)
+
+            self._container.seek(target_pts, backward=True, any_frame=False, stream=self._stream)
+            self._frames = self._container.decode(self._stream)
+
+            # Декодируем от ключевого кадра до нужного
+            for decoded in self._frames:
+                if decoded.pts is None:
+                    continue
+                decoded_pos = round(float((decoded.pts - start) * time_base) * self.fps)
+                if decoded_pos >= frame_position:
+                    frame = decoded
+                    break
+
+        if frame is None:
+            self._frames = None
+            self._last_pos = -1
+            return None
+
+        self._last_pos = frame_position
+        return frame.to_ndarray(format="rgb24")
+
+    def _close_av(self):
+        """Закрыть контейнер PyAV"""
+        if self._container is not None:
+            self._container.close()
+        self._container = None
+        self._stream = None
+        self._frames = None
+        self._last_pos = -1
+
+    def release(self):
+        """Освободить ресурсы"""
+        self._close_av()
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
 
 class VideoFrameLoader(QObject):
-    """Загрузчик видео-фреймов в отдельном потоке"""
+    """Декодирование и фильтрация видео-фреймов в отдельном потоке"""
 
-    frame_loaded = Signal(np.ndarray, dict)  # frame, metadata
-    loading_finished = Signal()
+    video_opened = Signal(str, dict)  # video_path, metadata
+    # request_id, frame_position, исходный кадр, кадр с фильтрами
+    frame_loaded = Signal(int, int, object, object)
     loading_error = Signal(str)
 
     def __init__(self):
         super().__init__()
-        self.video_path = None
-        self.frame_position = 0
-        self._should_stop = False
+        self._reader: Optional[VideoReader] = None
 
-    def load_frame(self, video_path: str, frame_position: int):
-        """Загрузить конкретный фрейм"""
-        self.video_path = video_path
-        self.frame_position = frame_position
-        self._load()
+        # LRU-кэш декодированных кадров: номер кадра -> RGB кадр
+        self._frame_cache: OrderedDict = OrderedDict()
+        self._frame_cache_size = FRAME_CACHE_MIN_ENTRIES
 
-    def _load(self):
-        """Загрузка фрейма из видео"""
-        try:
-            cap = cv2.VideoCapture(self.video_path)
+        # Номер последнего запроса кадра. Пишется из GUI потока; запросы
+        # с другим номером устарели и пропускаются (побеждает последний)
+        self.latest_request = 0
 
-            if not cap.isOpened():
-                self.loading_error.emit(f"Не удалось открыть видео: {self.video_path}")
+    def open_video(self, video_path: str):
+        """Открыть видео и сообщить его метаданные"""
+        self.release()
+
+        try:
+            reader = VideoReader(video_path)
+            if not reader.is_opened():
+                reader.release()
+                self.loading_error.emit(f"Не удалось открыть видео: {video_path}")
                 return
 
-            # Получаем метаданные
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            duration = total_frames / fps if fps > 0 else 0
-
-            metadata = {
-                'fps': fps,
-                'total_frames': total_frames,
-                'width': width,
-                'height': height,
-                'duration': duration
-            }
+            self._reader = reader
+            frame_bytes = max(reader.width * reader.height * 3, 1)
+            self._frame_cache_size = max(FRAME_CACHE_MIN_ENTRIES, FRAME_CACHE_BYTES // frame_bytes)
+
+            self.video_opened.emit(video_path, {
+                'fps': reader.fps,
+                'total_frames': reader.total_frames,
+                'width': reader.width,
+                'height': reader.height,
+                'duration': reader.duration
+            })
 
-            # Переходим к нужному фрейму
-            cap.set(cv2.CAP_PROP_POS_FRAMES, self.frame_position)
+        except Exception as e:
+            logger.error(f"Ошибка открытия видео: {e}", exc_info=True)
+            self.loading_error.emit(str(e))
 
-            ret, frame = cap.read()
-            cap.release()
+    def request_frame(self, request_id: int, frame_position: int,
+                      filters: List[Dict], preview_size: Tuple[int, int]):
+        """
+        Декодировать фрейм и применить к нему фильтры
+
+        Args:
+            request_id: Номер запроса
+            frame_position: Номер кадра
+            filters: Конфигурации фильтров
+            preview_size: Размер области превью (ширина, высота)
+        """
+        if request_id != self.latest_request or self._reader is None:
+            return
 
-            if ret:
-                # Конвертируем BGR в RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                self.frame_loaded.emit(frame_rgb, metadata)
-            else:
-                self.loading_error.emit(f"Не удалось прочитать фрейм {self.frame_position}")
+        try:
+            frame = self._read_frame(frame_position)
+            if frame is None:
+                self.loading_error.emit(f"Не удалось прочитать фрейм {frame_position}")
+                return
 
-            self.loading_finished.emit()
+            filtered = self._apply_filters(frame, filters, preview_size) if filters else frame
+            self.frame_loaded.emit(request_id, frame_position, frame, filtered)
 
         except Exception as e:
             logger.error(f"Ошибка загрузки фрейма: {e}", exc_info=True)
             self.loading_error.emit(str(e))
-            self.loading_finished.emit()
+
+    def release(self):
+        """Закрыть видео и очистить кэш"""
+        if self._reader is not None:
+            self._reader.release()
+            self._reader = None
+        self._frame_cache.clear()
+
+    def _read_frame(self, frame_position: int) -> Optional[np.ndarray]:
+        """
+        Получить кадр из кэша или декодировать его
+
+        Args:
+            frame_position: Номер кадра
+
+        Returns:
+            Кадр в RGB (не изменять - он хранится в кэше) или None
+        """
+        frame = self._frame_cache.get(frame_position)
+        if frame is not None:
+            self._frame_cache.move_to_end(frame_position)
+            return frame
+
+        frame = self._reader.read(frame_position)
+        if frame is not None:
+            self._frame_cache[frame_position] = frame
+            while len(self._frame_cache) > self._frame_cache_size:
+                self._frame_cache.popitem(last=False)
+        return frame
+
+    def _apply_filters(self, frame: np.ndarray, filters: List[Dict],
+                       preview_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Применить фильтры к фрейму
+
+        Args:
+            frame: RGB кадр (не изменяется)
+            filters: Конфигурации фильтров
+            preview_size: Размер области превью (ширина, высота)
+
+        Returns:
+            Кадр с примененными фильтрами
+        """
+        enabled_filters = [f for f in filters if f.get('enabled', True)]
+        if not enabled_filters:
+            return frame
+
+        # Копию делаем только перед фильтром, который рисует в кадре,
+        # пока результат еще разделяет память с исходным кадром
+        result = frame
+
+        try:
+            # Превью все равно масштабируется под label - фильтруем
+            # сразу уменьшенный кадр
+            if not any(f.get('id') in _COORDINATE_FILTERS for f in enabled_filters):
+                result = self._downscale_for_preview(result, preview_size)
+
+            for filter_config in enabled_filters:
+                filter_id = filter_config.get('id')
+                params = filter_config.get('params', {})
+
+                if filter_id in _INPLACE_FILTERS and np.may_share_memory(result, frame):
+                    result = result.copy()
+
+                # Применяем фильтры OpenCV
+                result = self._apply_single_filter(result, filter_id, params)
+
+        except Exception as e:
+            logger.error(f"Ошибка применения фильтров: {e}", exc_info=True)
+            return frame
+
+        return result
+
+    @staticmethod
+    def _downscale_for_preview(frame: np.ndarray, preview_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Уменьшить кадр до размера области превью
+
+        Args:
+            frame: RGB кадр
+            preview_size: Размер области превью (ширина, высота)
+
+        Returns:
+            Уменьшенный кадр или исходный, если уменьшать не нужно
+        """
+        height, width = frame.shape[:2]
+        preview_width, preview_height = preview_size
+        # Label еще не размещен (скрытая вкладка, первый проход layout)
+        if preview_width <= 0 or preview_height <= 0:
+            return frame
+
+        scale = min(1.0, preview_width / width, preview_height / height)
+        if scale >= PREVIEW_DOWNSCALE_THRESHOLD:
+            return frame
+
+        return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    def _apply_single_filter(self, frame: np.ndarray, filter_id: str, params: Dict,
+                             preview: bool = True) -> np.ndarray:
+        """
+        Применить один фильтр
+
+        Args:
+            frame: RGB кадр
+            filter_id: Идентификатор фильтра
+            params: Параметры фильтра
+            preview: Быстрая интерполяция для превью; False - LANCZOS4
+                для полноразмерного результата
+
+        Returns:
+            Кадр с примененным фильтром
+        """
+        try:
+            # === Видео фильтры ===
+
+            # Яркость/Контраст/Насыщенность (eq)
+            if filter_id == 'eq':
+                brightness = params.get('brightness', 0) / 100.0
+                contrast = params.get('contrast', 1.0)
+                saturation = params.get('saturation', 1.0)
+
+                # Все три коррекции одним проходом по кадру
+                if fused_eq is not None:
+                    if brightness != 0 or contrast != 1.0 or saturation != 1.0:
+                        adjusted = np.empty_like(frame)
+                        fused_eq(frame, np.float32(brightness), np.float32(contrast),
+                                  np.float32(saturation), adjusted)
+                        frame = adjusted
+                else:
+                    # Яркость и контраст - одна таблица на 256 значений
+                    if brightness != 0 or contrast != 1.0:
+                        frame = cv2.LUT(frame, _eq_lut(brightness, contrast))
+
+                    # Насыщенность
+                    if saturation != 1.0:
+                        # Канал S масштабируется в uint8 с насыщением
+                        hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+                        hsv[:, :, 1] = cv2.convertScaleAbs(hsv[:, :, 1], alpha=saturation)
+                        frame = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+
+            # Резкость (unsharp)
+            elif filter_id == 'unsharp':
+                amount = params.get('amount', 1.0)
+                if amount > 0:
+                    gaussian = cv2.GaussianBlur(frame, (0, 0), 2.0)
+                    frame = cv2.addWeighted(frame, 1.0 + amount, gaussian, -amount, 0)
+
+            # Шумоподавление (hqdn3d)
+            elif filter_id == 'hqdn3d':
+                luma_spatial = params.get('luma_spatial', 4.0)
+                frame = cv2.fastNlMeansDenoisingColored(frame, None, luma_spatial, luma_spatial, 7, 21)
+
+            # Отзеркаливание по горизонтали (view без копирования; цепочка
+            # отражений и crop складывается в одну индексацию)
+            elif filter_id == 'hflip':
+                frame = frame[:, ::-1]
+
+            # Отзеркаливание по вертикали
+            elif filter_id == 'vflip':
+                frame = frame[::-1]
+
+            # Поворот
+            elif filter_id == 'rotate':
+                angle = params.get('angle', 0)
+                if angle != 0:
+                    height, width = frame.shape[:2]
+                    matrix = _rotation_matrix(angle, width, height)
+                    frame = cv2.warpAffine(frame, matrix, (width, height))
+
+            # Масштабирование
+            elif filter_id == 'scale' or filter_id == 'scale_advanced':
+                width = params.get('width', frame.shape[1])
+                height = params.get('height', frame.shape[0])
+                if width != frame.shape[1] or height != frame.shape[0]:
+                    if not preview:
+                        interpolation = cv2.INTER_LANCZOS4
+                    elif width * height < frame.shape[0] * frame.shape[1]:
+                        interpolation = cv2.INTER_AREA
+                    else:
+                        interpolation = cv2.INTER_LINEAR
+                    frame = cv2.resize(frame, (width, height), interpolation=interpolation)
+
+            # Обрезка
+            elif filter_id == 'crop':
+                w = params.get('w', frame.shape[1])
+                h = params.get('h', frame.shape[0])
+                x = params.get('x', 0)
+                y = params.get('y', 0)
+                frame = frame[y:y+h, x:x+w]
+
+            # Текст/Watermark (drawtext)
+            elif filter_id == 'drawtext':
+                text = params.get('text', 'Sample Text')
+                x = params.get('x', 10)
+                y = params.get('y', 30)
+                fontsize = params.get('fontsize', 24)
+                fontcolor = params.get('fontcolor', 'white')
+
+                color = _TEXT_COLORS.get(fontcolor, (255, 255, 255))
+                colored, inverse_alpha, origin_x, origin_y = _text_sprite(
+                    text, fontsize / 24, color)
+
+                # (x, y) - начало базовой линии, как в cv2.putText;
+                # часть текста за границами кадра отбрасывается
+                left, top = x - origin_x, y - origin_y
+                x0, y0 = max(left, 0), max(top, 0)
+                x1 = min(left + colored.shape[1], frame.shape[1])
+                y1 = min(top + colored.shape[0], frame.shape[0])
+                if x0 < x1 and y0 < y1:
+                    roi = frame[y0:y1, x0:x1]
+                    sprite = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+                    roi[:] = roi * inverse_alpha[sprite] + colored[sprite] + 0.5
+
+        except Exception as e:
+            logger.error(f"Ошибка применения фильтра {filter_id}: {e}", exc_info=True)
+
+        return frame
 
 
 class VideoPreviewWidget(QWidget):
@@ -88,12 +601,21 @@ class VideoPreviewWidget(QWidget):
     # Сигналы
     frame_changed = Signal(int)  # current_frame
 
+    # Запросы к загрузчику фреймов (обрабатываются в его потоке)
+    _open_requested = Signal(str)
+    _frame_requested = Signal(int, int, object, object)
+    _close_requested = Signal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
+        # SIMD-ветки OpenCV (cvtColor, resize, LUT) и потоки для фильтров
+        cv2.setUseOptimized(True)
+        cv2.setNumThreads(os.cpu_count() or 1)
+
         # Состояние
         self.video_path: Optional[str] = None
-        self.video_capture: Optional[cv2.VideoCapture] = None
+        self._video_opened = False
         self.current_frame: Optional[np.ndarray] = None
         self.original_frame: Optional[np.ndarray] = None  # Оригинальный фрейм без фильтров
 
@@ -110,13 +632,40 @@ class VideoPreviewWidget(QWidget):
         self.playback_timer = QTimer()
         self.playback_timer.timeout.connect(self._next_frame)
 
+        # Отложенный seek при перетаскивании seekbar
+        self._pending_seek_pos: Optional[int] = None
+        self._seek_timer = QTimer(self)
+        self._seek_timer.setSingleShot(True)
+        self._seek_timer.setInterval(SEEK_DEBOUNCE_MS)
+        self._seek_timer.timeout.connect(self._do_pending_seek)
+
         # Фильтры для live preview
         self.active_filters: List[Dict] = []
 
-        # Загрузчик фреймов
+        # Буфер, на который ссылается последний QImage
+        self._display_buffer: Optional[np.ndarray] = None
+
+        # Последний показанный кадр: (кадр, (ширина, высота, режим), pixmap)
+        self._display_cache: Optional[tuple] = None
+
+        # Загрузчик фреймов: декодирование и фильтры выполняются в своем потоке
+        self._frame_request_id = 0
+        # Номер запроса последнего показанного кадра: более новые ответы
+        # показываются, даже если после них уже запрошен следующий кадр
+        self._shown_request_id = 0
+        # Запрошенный кадр еще не получен; при воспроизведении следующий
+        # кадр запрашивается только после прихода текущего
+        self._frame_in_flight = False
+        self._playback_behind = False
+        # Размер label, под который запрошен текущий кадр с фильтрами
+        self._requested_preview_size: Tuple[int, int] = (0, 0)
         self.frame_loader = VideoFrameLoader()
         self.loader_thread = QThread()
         self.frame_loader.moveToThread(self.loader_thread)
+        self._open_requested.connect(self.frame_loader.open_video)
+        self._frame_requested.connect(self.frame_loader.request_frame)
+        self._close_requested.connect(self.frame_loader.release)
+        self.frame_loader.video_opened.connect(self._on_video_opened)
         self.frame_loader.frame_loaded.connect(self._on_frame_loaded)
         self.frame_loader.loading_error.connect(self._on_loading_error)
         self.loader_thread.start()
@@ -294,231 +843,124 @@ class VideoPreviewWidget(QWidget):
         if self.is_playing:
             self._toggle_playback()
 
-        # Закрываем предыдущее видео
-        if self.video_capture:
-            self.video_capture.release()
-
+        # Предыдущее видео закрывается загрузчиком перед открытием нового
+        self._video_opened = False
+        self._drop_pending_frames()
         self.video_path = video_path
 
-        try:
-            # Открываем видео
-            self.video_capture = cv2.VideoCapture(video_path)
+        # Кадр прежнего видео не перерисовываем до первого кадра нового
+        self.current_frame = None
+        self.original_frame = None
+        self._display_cache = None
 
-            if not self.video_capture.isOpened():
-                logger.error(f"Не удалось открыть видео: {video_path}")
-                self.info_label.setText("Ошибка загрузки видео")
-                return
+        self._open_requested.emit(video_path)
 
-            # Получаем метаданные
-            self.fps = self.video_capture.get(cv2.CAP_PROP_FPS)
-            self.total_frames = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
-            self.video_width = int(self.video_capture.get(cv2.CAP_PROP_FRAME_WIDTH))
-            self.video_height = int(self.video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            self.duration = self.total_frames / self.fps if self.fps > 0 else 0
-
-            # Обновляем UI
-            self.timeline_slider.setMaximum(self.total_frames - 1)
-            self.timeline_slider.setEnabled(True)
-            self.play_button.setEnabled(True)
-            self.prev_button.setEnabled(True)
-            self.next_button.setEnabled(True)
-
-            self.time_label_total.setText(self._format_time(self.duration))
-
-            # Компактный вывод информации
-            filename = Path(video_path).name
-            # Сокращаем имя если слишком длинное
-            if len(filename) > 30:
-                filename = filename[:27] + "..."
-            self.info_label.setText(f"{self.video_width}x{self.video_height} • {self.fps:.0f}fps • {filename}")
-
-            # Загружаем первый фрейм
-            self.current_frame_pos = 0
-            self._load_current_frame()
+    def _on_video_opened(self, video_path: str, metadata: dict):
+        """Обработка открытия видео в потоке загрузчика"""
+        if video_path != self.video_path:
+            return  # Пока видео открывалось, выбрали другое
 
-            logger.info(f"Видео загружено: {video_path} ({self.video_width}x{self.video_height}, {self.fps} FPS, {self.total_frames} frames)")
+        self._video_opened = True
 
-        except Exception as e:
-            logger.error(f"Ошибка загрузки видео: {e}", exc_info=True)
-            self.info_label.setText("Ошибка загрузки")
+        # Получаем метаданные
+        self.fps = metadata['fps']
+        self.total_frames = metadata['total_frames']
+        self.video_width = metadata['width']
+        self.video_height = metadata['height']
+        self.duration = metadata['duration']
 
-    def _load_current_frame(self):
-        """Загрузить текущий фрейм"""
-        if not self.video_capture:
-            return
+        # Обновляем UI
+        self.timeline_slider.setMaximum(self.total_frames - 1)
+        self.timeline_slider.setEnabled(True)
+        self.play_button.setEnabled(True)
+        self.prev_button.setEnabled(True)
+        self.next_button.setEnabled(True)
 
-        try:
-            self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame_pos)
-            ret, frame = self.video_capture.read()
+        self.time_label_total.setText(self._format_time(self.duration))
 
-            if ret:
-                # Конвертируем BGR в RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                self.original_frame = frame_rgb.copy()
-                self.current_frame = frame_rgb
+        # Компактный вывод информации
+        filename = Path(video_path).name
+        # Сокращаем имя если слишком длинное
+        if len(filename) > 30:
+            filename = filename[:27] + "..."
+        self.info_label.setText(f"{self.video_width}x{self.video_height} • {self.fps:.0f}fps • {filename}")
 
-                # Применяем фильтры если есть
-                if self.active_filters:
-                    self.current_frame = self._apply_filters(self.current_frame)
+        # Загружаем первый фрейм
+        self.current_frame_pos = 0
+        self._load_current_frame()
 
-                # Отображаем фрейм
-                self._display_frame(self.current_frame)
+        logger.info(f"Видео загружено: {video_path} ({self.video_width}x{self.video_height}, {self.fps} FPS, {self.total_frames} frames)")
 
-                # Обновляем время
-                current_time = self.current_frame_pos / self.fps if self.fps > 0 else 0
-                self.time_label_current.setText(self._format_time(current_time))
+    def _next_frame_request(self) -> int:
+        """Получить номер нового запроса; ответы на прежние запросы отбрасываются"""
+        self._frame_request_id += 1
+        self.frame_loader.latest_request = self._frame_request_id
+        return self._frame_request_id
 
-                # Обновляем seekbar без триггера события
-                self.timeline_slider.blockSignals(True)
-                self.timeline_slider.setValue(self.current_frame_pos)
-                self.timeline_slider.blockSignals(False)
+    def _drop_pending_frames(self):
+        """Отбросить ответы на все уже отправленные запросы кадров"""
+        self._shown_request_id = self._next_frame_request()
+        self._frame_in_flight = False
+        self._playback_behind = False
 
-                self.frame_changed.emit(self.current_frame_pos)
+    def _load_current_frame(self):
+        """Запросить текущий фрейм у загрузчика"""
+        if not self._video_opened:
+            return
 
-        except Exception as e:
-            logger.error(f"Ошибка загрузки фрейма: {e}", exc_info=True)
+        # active_filters заменяется целиком в set_filters, поэтому список
+        # можно передать в поток загрузчика без копирования
+        preview_size = (self.video_label.width(), self.video_label.height())
+        self._requested_preview_size = preview_size
+        self._frame_in_flight = True
+        self._frame_requested.emit(
+            self._next_frame_request(), self.current_frame_pos,
+            self.active_filters, preview_size
+        )
 
     def _display_frame(self, frame: np.ndarray):
         """Отобразить фрейм на label"""
         try:
-            height, width, channel = frame.shape
-            bytes_per_line = 3 * width
-
-            q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
+            # Масштабируем под размер label с сохранением пропорций;
+            # при воспроизведении и перемотке качество сглаживания не заметно
+            if self.is_playing or self.timeline_slider.isSliderDown():
+                transformation = Qt.TransformationMode.FastTransformation
+            else:
+                transformation = Qt.TransformationMode.SmoothTransformation
+
+            # Тот же кадр в том же размере (повторные resizeEvent) -
+            # берем уже масштабированный pixmap
+            label_size = self.video_label.size()
+            key = (label_size.width(), label_size.height(), transformation)
+            if self._display_cache is not None:
+                cached_frame, cached_key, cached_pixmap = self._display_cache
+                if cached_frame is frame and cached_key == key:
+                    self.video_label.setPixmap(cached_pixmap)
+                    return
+
+            # После crop и отражений кадр может быть view с "чужим" шагом строк
+            buffer = np.ascontiguousarray(frame)
+            height, width, channel = buffer.shape
+
+            # QImage не владеет буфером - держим ссылку, пока строится pixmap
+            self._display_buffer = buffer
+            q_image = QImage(buffer.data, width, height, buffer.strides[0], QImage.Format.Format_RGB888)
             pixmap = QPixmap.fromImage(q_image)
 
-            # Масштабируем под размер label с сохранением пропорций
             scaled_pixmap = pixmap.scaled(
-                self.video_label.size(),
+                label_size,
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
+                transformation
             )
 
+            # Храним сам кадр, а не id(): id освободившегося массива
+            # может достаться новому
+            self._display_cache = (frame, key, scaled_pixmap)
             self.video_label.setPixmap(scaled_pixmap)
 
         except Exception as e:
             logger.error(f"Ошибка отображения фрейма: {e}", exc_info=True)
 
-    def _apply_filters(self, frame: np.ndarray) -> np.ndarray:
-        """Применить активные фильтры к фрейму"""
-        if not self.active_filters:
-            return frame
-
-        result = frame.copy()
-
-        try:
-            for filter_config in self.active_filters:
-                if not filter_config.get('enabled', True):
-                    continue
-
-                filter_id = filter_config.get('id')
-                params = filter_config.get('params', {})
-
-                # Применяем фильтры OpenCV
-                result = self._apply_single_filter(result, filter_id, params)
-
-        except Exception as e:
-            logger.error(f"Ошибка применения фильтров: {e}", exc_info=True)
-            return frame
-
-        return result
-
-    def _apply_single_filter(self, frame: np.ndarray, filter_id: str, params: Dict) -> np.ndarray:
-        """Применить один фильтр"""
-        try:
-            # === Видео фильтры ===
-
-            # Яркость/Контраст/Насыщенность (eq)
-            if filter_id == 'eq':
-                brightness = params.get('brightness', 0) / 100.0
-                contrast = params.get('contrast', 1.0)
-                saturation = params.get('saturation', 1.0)
-
-                # Яркость
-                if brightness != 0:
-                    frame = cv2.convertScaleAbs(frame, alpha=1, beta=brightness * 255)
-
-                # Контраст
-                if contrast != 1.0:
-                    frame = cv2.convertScaleAbs(frame, alpha=contrast, beta=0)
-
-                # Насыщенность
-                if saturation != 1.0:
-                    hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV).astype(np.float32)
-                    hsv[:, :, 1] = np.clip(hsv[:, :, 1] * saturation, 0, 255)
-                    frame = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2RGB)
-
-            # Резкость (unsharp)
-            elif filter_id == 'unsharp':
-                amount = params.get('amount', 1.0)
-                if amount > 0:
-                    gaussian = cv2.GaussianBlur(frame, (0, 0), 2.0)
-                    frame = cv2.addWeighted(frame, 1.0 + amount, gaussian, -amount, 0)
-
-            # Шумоподавление (hqdn3d)
-            elif filter_id == 'hqdn3d':
-                luma_spatial = params.get('luma_spatial', 4.0)
-                frame = cv2.fastNlMeansDenoisingColored(frame, None, luma_spatial, luma_spatial, 7, 21)
-
-            # Отзеркаливание по горизонтали
-            elif filter_id == 'hflip':
-                frame = cv2.flip(frame, 1)
-
-            # Отзеркаливание по вертикали
-            elif filter_id == 'vflip':
-                frame = cv2.flip(frame, 0)
-
-            # Поворот
-            elif filter_id == 'rotate':
-                angle = params.get('angle', 0)
-                if angle != 0:
-                    height, width = frame.shape[:2]
-                    center = (width // 2, height // 2)
-                    matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-                    frame = cv2.warpAffine(frame, matrix, (width, height))
-
-            # Масштабирование
-            elif filter_id == 'scale' or filter_id == 'scale_advanced':
-                width = params.get('width', frame.shape[1])
-                height = params.get('height', frame.shape[0])
-                if width != frame.shape[1] or height != frame.shape[0]:
-                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LANCZOS4)
-
-            # Обрезка
-            elif filter_id == 'crop':
-                w = params.get('w', frame.shape[1])
-                h = params.get('h', frame.shape[0])
-                x = params.get('x', 0)
-                y = params.get('y', 0)
-                frame = frame[y:y+h, x:x+w]
-
-            # Текст/Watermark (drawtext)
-            elif filter_id == 'drawtext':
-                text = params.get('text', 'Sample Text')
-                x = params.get('x', 10)
-                y = params.get('y', 30)
-                fontsize = params.get('fontsize', 24)
-                fontcolor = params.get('fontcolor', 'white')
-
-                # Конвертируем цвет
-                color_map = {
-                    'white': (255, 255, 255),
-                    'black': (0, 0, 0),
-                    'red': (255, 0, 0),
-                    'green': (0, 255, 0),
-                    'blue': (0, 0, 255),
-                    'yellow': (255, 255, 0)
-                }
-                color = color_map.get(fontcolor, (255, 255, 255))
-
-                cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX,
-                           fontsize / 24, color, 2, cv2.LINE_AA)
-
-        except Exception as e:
-            logger.error(f"Ошибка применения фильтра {filter_id}: {e}", exc_info=True)
-
-        return frame
-
     def set_filters(self, filters: List[Dict]):
         """Установить список фильтров для preview и автоматически применить их"""
         self.active_filters = filters
@@ -528,18 +970,22 @@ class VideoPreviewWidget(QWidget):
 
     def refresh_preview(self):
         """Обновить превью с текущими фильтрами"""
-        if self.original_frame is not None:
-            self.current_frame = self.original_frame.copy()
-
-            if self.active_filters:
-                self.current_frame = self._apply_filters(self.current_frame)
+        if self.original_frame is None:
+            return
 
+        if self.active_filters:
+            # Исходный кадр берется из кэша загрузчика
+            self._load_current_frame()
+        else:
+            # Без фильтров показываем исходный кадр как есть; запрос,
+            # который еще в пути (например, seek), не отменяем
+            self.current_frame = self.original_frame
             self._display_frame(self.current_frame)
-            logger.info("Preview обновлен")
+        logger.info("Preview обновлен")
 
     def _toggle_playback(self):
         """Переключить воспроизведение"""
-        if not self.video_capture:
+        if not self._video_opened:
             return
 
         self.is_playing = not self.is_playing
@@ -554,9 +1000,19 @@ class VideoPreviewWidget(QWidget):
             self.play_button.setToolTip("Play")
             self.playback_timer.stop()
 
+            # Перерисовываем кадр паузы со сглаживанием
+            if self.current_frame is not None:
+                self._display_frame(self.current_frame)
+
     def _next_frame(self):
         """Следующий фрейм"""
-        if not self.video_capture:
+        if not self._video_opened:
+            return
+
+        # Кадр не успел декодироваться за интервал таймера - не забегаем
+        # вперед, следующий кадр запросит _on_frame_loaded
+        if self.is_playing and self._frame_in_flight:
+            self._playback_behind = True
             return
 
         self.current_frame_pos += 1
@@ -568,7 +1024,7 @@ class VideoPreviewWidget(QWidget):
 
     def _prev_frame(self):
         """Предыдущий фрейм"""
-        if not self.video_capture:
+        if not self._video_opened:
             return
 
         self.current_frame_pos -= 1
@@ -584,26 +1040,70 @@ class VideoPreviewWidget(QWidget):
             self._toggle_playback()
 
     def _on_timeline_released(self):
-        """Обработка отпускания seekbar"""
-        pass
+        """Обработка отпускания seekbar - сразу переходим к итоговой позиции"""
+        if not self._video_opened:
+            return
+
+        self._seek_timer.stop()
+        self._pending_seek_pos = self.timeline_slider.value()
+        self._do_pending_seek()
 
     def _on_timeline_changed(self, value: int):
         """Обработка изменения позиции на seekbar"""
-        if not self.video_capture:
+        if not self._video_opened:
             return
 
         # Проверяем, было ли изменение от пользователя
         if self.timeline_slider.isSliderDown():
-            self.current_frame_pos = value
-            self._load_current_frame()
+            self._pending_seek_pos = value
+            self._seek_timer.start()
+
+    def _do_pending_seek(self):
+        """Перейти к последней запрошенной позиции seekbar"""
+        if self._pending_seek_pos is None:
+            return
 
-    def _on_frame_loaded(self, frame: np.ndarray, metadata: dict):
+        self.current_frame_pos = self._pending_seek_pos
+        self._pending_seek_pos = None
+        self._load_current_frame()
+
+    def _on_frame_loaded(self, request_id: int, frame_position: int,
+                         original: np.ndarray, filtered: np.ndarray):
         """Обработка загруженного фрейма из потока"""
-        self.current_frame = frame
-        self._display_frame(frame)
+        if request_id <= self._shown_request_id:
+            return  # Уже показан более новый фрейм
+
+        self._shown_request_id = request_id
+        if request_id == self._frame_request_id:
+            self._frame_in_flight = False
+
+        self.original_frame = original
+        # Запрос мог уйти до того, как фильтры сняли
+        self.current_frame = filtered if self.active_filters else original
+
+        # Отображаем фрейм
+        self._display_frame(self.current_frame)
+
+        # Обновляем время
+        current_time = frame_position / self.fps if self.fps > 0 else 0
+        self.time_label_current.setText(self._format_time(current_time))
+
+        # Обновляем seekbar без триггера события
+        self.timeline_slider.blockSignals(True)
+        self.timeline_slider.setValue(frame_position)
+        self.timeline_slider.blockSignals(False)
+
+        self.frame_changed.emit(frame_position)
+
+        if self._playback_behind and not self._frame_in_flight:
+            self._playback_behind = False
+            if self.is_playing:
+                self._next_frame()
 
     def _on_loading_error(self, error: str):
         """Обработка ошибки загрузки"""
+        self._frame_in_flight = False
+        self._playback_behind = False
         logger.error(f"Ошибка загрузки: {error}")
         self.info_label.setText(f"Ошибка: {error}")
 
@@ -618,15 +1118,19 @@ class VideoPreviewWidget(QWidget):
         if self.is_playing:
             self._toggle_playback()
 
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
+        self._seek_timer.stop()
+        self._pending_seek_pos = None
+
+        self._video_opened = False
+        self._drop_pending_frames()
+        self._close_requested.emit()
 
         self.video_path = None
         self.current_frame = None
         self.original_frame = None
         self.current_frame_pos = 0
 
+        self._display_cache = None
         self.video_label.clear()
         self.video_label.setText("Загрузите видео для превью")
 
@@ -649,12 +1153,28 @@ class VideoPreviewWidget(QWidget):
         if self.current_frame is not None:
             self._display_frame(self.current_frame)
 
-    def closeEvent(self, event):
-        """Обработка закрытия виджета"""
-        if self.video_capture:
-            self.video_capture.release()
+        # Кадр с фильтрами уменьшен под прежний размер label - после
+        # увеличения запрашиваем его заново (при воспроизведении новый
+        # размер и так придет со следующим кадром)
+        if self.active_filters and self._video_opened and not self.is_playing:
+            requested_width, requested_height = self._requested_preview_size
+            if (self.video_label.width() > requested_width
+                    or self.video_label.height() > requested_height):
+                self._load_current_frame()
+
+    def shutdown(self):
+        """Остановить поток загрузчика и закрыть видео (при закрытии окна)"""
+        if self.playback_timer.isActive():
+            self.playback_timer.stop()
+        self._seek_timer.stop()
 
         self.loader_thread.quit()
         self.loader_thread.wait()
 
+        # Поток остановлен - закрываем видео напрямую
+        self.frame_loader.release()
+
+    def closeEvent(self, event):
+        """Обработка закрытия виджета"""
+        self.shutdown()
         event.accept()